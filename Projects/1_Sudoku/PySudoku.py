@@ -1,55 +1,124 @@
 import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, "objects"))
 import SudokuSquare
 from utils import *
 from GameResources import *
 
 
-def play(values, result, history):
+def square_origin(x, y):
+    """The top left corner of the square in column x and row y of the board image"""
+    startX = (x * 57) + (38, 99, 159)[x // 3]
+    startY = (y * 57) + (35, 100, 165)[y // 3]
+    return startX, startY
+
+
+def square_number(value):
+    if len(value) > 1 or value == '' or value == '.':
+        return None
+    return int(value)
+
+
+class BoardRenderer:
+    """Retained-mode board: the squares are created and drawn once, and each
+    assignment redraws only the square that changed
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    screen(pygame.Surface)
+        the display surface
+
+    background(pygame.Surface)
+        the bare board image; the part under a square is restored from it
+        before the square is redrawn
+    """
+    def __init__(self, values, screen, background):
+        self.screen = screen
+        self.background = background
+        self.values = dict(values)
+        self.squares = {}
+        for y in range(9):
+            for x in range(9):
+                box = rows[y] + cols[x]
+                startX, startY = square_origin(x, y)
+                self.squares[box] = SudokuSquare.SudokuSquare(
+                    square_number(values[box]), startX, startY, "N", x, y)
+        self.redraw()
+
+    def redraw(self):
+        """Draw the whole board"""
+        self.screen.blit(self.background, (0, 0))
+        for square in self.squares.values():
+            square.draw()
+
+    def assign(self, box, value):
+        """Show an assignment, returning the dirty rectangle (or None if the
+        square did not change)
+        """
+        if self.values[box] == value:
+            return None
+        self.values[box] = value
+        square = self.squares[box]
+        square.setNumber(square_number(value))
+        rect = square.rect()
+        self.screen.blit(self.background, rect, rect)
+        square.draw()
+        return rect
+
+
+def load_background():
+    return pygame.image.load(os.path.join(HERE, "images", "sudoku-board-bare.jpg")).convert()
+
+
+def play(values, result, history, frames=None, fps=5):
+    """Replay the assignments that led to `result`
+
+    Parameters
+    ----------
+    values(dict)
+        the starting puzzle, as a dictionary of the form {'box_name': '123456789', ...}
+
+    result(dict)
+        the solved puzzle
+
+    history(HistoryLog)
+        the assignments recorded while solving (see utils.reconstruct)
+
+    frames(string)
+        headless mode: instead of opening a window, write one image per frame
+        to this filename pattern, e.g. 'replay/frame%05d.png' (the format
+        follows the extension; .bmp and .tga are much faster to write than .png)
+
+    fps(int)
+        the frame rate of the on-screen replay
+    """
     assignments = reconstruct(result, history)
+    if frames:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
     pygame.init()
 
     size = width, height = 700, 700
     screen = pygame.display.set_mode(size)
+    board = BoardRenderer(values, screen, load_background())
 
-    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
+    if frames:
+        count = write_frames(board, assignments, frames)
+        pygame.quit()
+        return count
 
     clock = pygame.time.Clock()
-
-    while True:
-        pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
-        for y in range(9):
-            for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                string_number = values[rows[y] + cols[x]]
-                if len(string_number) > 1 or string_number == '' or string_number == '.':
-                    number = None
-                else:
-                    number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
-
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
-
-        pygame.display.flip()
-        pygame.display.update()
-        clock.tick(5)
-
-        if len(assignments) == 0:
-            break
-        box, value = assignments.pop()
-        values[box] = value
+    pygame.display.flip()
+    for box, value in assignments:
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            pygame.quit()
+            return
+        rect = board.assign(box, value)
+        if rect is not None:
+            pygame.display.update(rect)
+            clock.tick(fps)
 
     # leave game showing until closed by user
     while True:
@@ -57,3 +126,23 @@ def play(values, result, history):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 quit()
+
+
+def write_frames(board, assignments, pattern):
+    """Save the board after every assignment that changes a square
+
+    Returns
+    -------
+    int
+        The number of frames written (including the starting board)
+    """
+    directory = os.path.dirname(pattern)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pygame.image.save(board.screen, pattern % 0)
+    count = 1
+    for box, value in assignments:
+        if board.assign(box, value) is not None:
+            pygame.image.save(board.screen, pattern % count)
+            count += 1
+    return count
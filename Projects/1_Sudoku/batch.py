@@ -0,0 +1,208 @@
+"""Bulk Sudoku solving over puzzle files
+
+Reads one 81-character puzzle per line (with '.' or '0' for empty boxes; 256
+and 625 character lines are solved as 16x16 and 25x25 boards) from
+a file or stdin, solves the puzzles in chunks on a process pool, and writes
+the solutions back in input order with a throughput and latency report.
+
+Puzzles are solved with the standard rules (rows, columns and squares) by
+default; pass --diagonal to also require both main diagonals to hold every
+digit, as in the diagonal sudoku solved by solution.py.
+
+    $ python batch.py puzzles.txt -o solutions.txt -j 8
+    $ cat puzzles.txt | python batch.py --diagonal > solutions.txt
+"""
+import argparse
+import os
+import sys
+
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from timeit import default_timer as timer
+
+import bitboard
+
+from utils import board_tables
+
+
+UNSOLVABLE = 'unsolvable'
+GRID_LENGTHS = (81, 256, 625)
+PERCENTILES = (50, 90, 99, 100)
+
+
+class BatchStats:
+    """Running totals for a batch run
+
+    Attributes
+    ----------
+    count : int
+        The number of puzzles processed so far
+
+    unsolvable : int
+        The number of puzzles that have no solution
+
+    latencies : array
+        Per-puzzle solve time in seconds (measured inside the worker)
+    """
+    def __init__(self):
+        self.count = 0
+        self.unsolvable = 0
+        self.latencies = array('d')
+        self.start = timer()
+        self.end = None
+
+    @property
+    def elapsed(self):
+        return (self.end or timer()) - self.start
+
+    @property
+    def throughput(self):
+        """ Puzzles solved per second of wall clock time """
+        return self.count / self.elapsed if self.elapsed else 0.
+
+    def percentiles(self, ps=PERCENTILES):
+        """ Nearest-rank percentiles of the per-puzzle latencies (in seconds) """
+        if not self.latencies:
+            return [0.] * len(ps)
+        ordered = sorted(self.latencies)
+        n = len(ordered)
+        return [ordered[max(0, min(n - 1, -(-p * n // 100) - 1))] for p in ps]
+
+    def report(self):
+        lines = ["Puzzles: {}  Unsolvable: {}  Time elapsed in seconds: {:.3f}".format(
+                     self.count, self.unsolvable, self.elapsed),
+                 "Throughput: {:.1f} puzzles/sec".format(self.throughput)]
+        lines.append("Latency (ms): " + "  ".join(
+            "p{}={:.3f}".format(p, 1000 * t) for p, t in zip(PERCENTILES, self.percentiles())))
+        return "\n".join(lines)
+
+
+def read_puzzles(lines):
+    """Normalize puzzle lines into grid strings
+
+    Blank lines and lines starting with '#' are skipped, and '0' is accepted
+    in place of '.' for empty boxes.
+
+    Raises
+    ------
+    ValueError
+        If a line is not the length of a 9x9, 16x16 or 25x25 grid
+    """
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if len(line) not in GRID_LENGTHS:
+            raise ValueError("line {}: expected one of {} characters, found {}".format(
+                lineno, GRID_LENGTHS, len(line)))
+        yield line.replace('0', '.')
+
+
+def solve_chunk(grids, diagonal=False):
+    """Solve a list of grids, returning (solution, seconds) pairs in order
+
+    The units of each grid are those of utils.board_tables for its order, with
+    the main diagonals included only when diagonal is True.
+    """
+    results = []
+    for grid in grids:
+        start = timer()
+        tables = board_tables(int(round(len(grid) ** 0.25)), diagonal=diagonal)
+        board = bitboard.search(bitboard.grid2bits(grid, tables), tables)
+        results.append((bitboard.bits2grid(board) if board else UNSOLVABLE, timer() - start))
+    return results
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def solve_stream(grids, workers=None, chunksize=256, stats=None, diagonal=False):
+    """Solve a stream of grids on a process pool, yielding solutions in input order
+
+    At most a few chunks per worker are in flight at any time, so arbitrarily
+    long inputs are processed in bounded memory.
+
+    Parameters
+    ----------
+    grids : iterable
+        The puzzles to solve as 81-character grid strings
+
+    workers : int
+        The number of worker processes (defaults to os.cpu_count()); with a
+        single worker the puzzles are solved in the calling process
+
+    chunksize : int
+        The number of puzzles sent to a worker in each task
+
+    stats : BatchStats
+        Optional stats object that is updated as results are yielded
+
+    diagonal : bool
+        Whether the two main diagonals are units (False by default, which
+        solves the puzzles with the standard rules)
+
+    Yields
+    ------
+    str
+        The solved grid for each input puzzle, or UNSOLVABLE
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(grids, chunksize)
+    if workers == 1:
+        results = (solve_chunk(chunk, diagonal) for chunk in chunks)
+        yield from _collect(results, stats)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(solve_chunk, chunk, diagonal))
+            if len(pending) >= 2 * workers:
+                yield from _collect([pending.popleft().result()], stats)
+        while pending:
+            yield from _collect([pending.popleft().result()], stats)
+
+
+def _collect(results, stats):
+    for chunk in results:
+        for solution, seconds in chunk:
+            if stats is not None:
+                stats.count += 1
+                stats.unsolvable += solution == UNSOLVABLE
+                stats.latencies.append(seconds)
+            yield solution
+
+
+def main(infile, outfile, workers=None, chunksize=256, diagonal=False):
+    stats = BatchStats()
+    for solution in solve_stream(read_puzzles(infile), workers, chunksize, stats, diagonal):
+        outfile.write(solution + "\n")
+    stats.end = timer()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a file of Sudoku puzzles (one " +
+        "81-character grid per line) and write the solutions in the same order.")
+    parser.add_argument('input', nargs='?', type=argparse.FileType('r'), default=sys.stdin,
+                        help="The puzzle file to read (defaults to stdin)")
+    parser.add_argument('-o', '--output', type=argparse.FileType('w'), default=sys.stdout,
+                        help="The file to write solutions to (defaults to stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="The number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument('-c', '--chunksize', type=int, default=256,
+                        help="The number of puzzles sent to a worker at a time")
+    parser.add_argument('--diagonal', action='store_true',
+                        help="Also treat the two main diagonals as units (by default " +
+                        "puzzles are solved with the standard rules)")
+    args = parser.parse_args()
+
+    stats = main(args.input, args.output, args.workers, args.chunksize, args.diagonal)
+    print(stats.report(), file=sys.stderr)
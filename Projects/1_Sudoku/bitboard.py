@@ -0,0 +1,538 @@
+"""Bitmask board representation for the Sudoku solver
+
+A bitboard is a flat list with one int per box (in row-major order, the same
+as `utils.boxes` for 9x9 boards) where bit k is set when digit k + 1 is still a
+candidate for that box, e.g. '123456789' is 0b111111111 and '3' is 0b000000100.
+Copying a bitboard for a search branch is a single list slice, and every
+strategy below updates candidates with bitwise operations instead of string
+edits.
+
+The strategies mirror the dict-based versions in solution.py. Every function
+takes an optional `tables` argument (see utils.BoardTables) describing the
+units and peers of the board; by default 9x9 boards share the units in
+solution.unitlist (including the diagonal units) and larger boards use the
+standard rows, columns and squares for their order from utils.board_tables.
+"""
+from timeit import default_timer as timer
+
+from utils import boxes, cols, board_tables, unit_tables
+
+import solution
+
+
+DEFAULT_TABLES = unit_tables(solution.unitlist, boxes, cols)
+_tables_by_size = {len(boxes): DEFAULT_TABLES}
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(mask):
+        return bin(mask).count('1')
+
+
+def tables_for(board, diagonal=None):
+    """Return the BoardTables for a board (or grid) based on its length
+
+    With diagonal=None these are the default tables (the units of
+    solution.unitlist for 9x9 boards, the standard units otherwise); True or
+    False picks board_tables with or without the diagonal units.
+    """
+    tables = _tables_by_size.get(len(board)) if diagonal is None else None
+    if tables is None:
+        order = int(round(len(board) ** 0.25))
+        if order ** 4 != len(board):
+            raise ValueError("a board must have order**4 boxes, found {}".format(len(board)))
+        if diagonal is not None:
+            return board_tables(order, diagonal=diagonal)
+        tables = _tables_by_size[len(board)] = board_tables(order)
+    return tables
+
+
+def all_digits(tables):
+    """ The candidate mask of an empty box """
+    return (1 << tables.size) - 1
+
+
+def mask2digits(mask, digits=cols):
+    """ The digit symbols set in a candidate mask, e.g. 0b101 -> '13' """
+    return ''.join(d for idx, d in enumerate(digits) if mask >> idx & 1)
+
+
+def values2bits(values, tables=None):
+    """Convert the dictionary board representation to a bitboard
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    list
+        a list of ints with one candidate bitmask per box
+    """
+    tables = tables or tables_for(values)
+    bits = {digit: 1 << idx for idx, digit in enumerate(tables.digits)}
+    board = []
+    for box in tables.boxes:
+        mask = 0
+        for digit in values[box]:
+            mask |= bits[digit]
+        board.append(mask)
+    return board
+
+
+def bits2values(board, tables=None):
+    """Convert a bitboard to the dictionary board representation
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    tables = tables or tables_for(board)
+    return {box: mask2digits(mask, tables.digits) for box, mask in zip(tables.boxes, board)}
+
+
+def grid2bits(grid, tables=None):
+    """Convert a grid string directly into a bitboard (skipping the dict form)
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid with '.' for empty boxes.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Returns
+    -------
+    list
+        a list of ints with one candidate bitmask per box
+    """
+    tables = tables or tables_for(grid)
+    bits = {digit: 1 << idx for idx, digit in enumerate(tables.digits)}
+    empty = all_digits(tables)
+    return [bits.get(val, empty) for val in grid]
+
+
+def bits2grid(board, tables=None):
+    """Convert a bitboard to a grid string ('.' for boxes without a single value)
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    a string representing a sudoku grid.
+    """
+    digits = (tables or tables_for(board)).digits
+    return ''.join(digits[mask.bit_length() - 1] if mask and not mask & (mask - 1) else '.'
+                   for mask in board)
+
+
+def eliminate(board, tables=None):
+    """Apply the eliminate strategy to a bitboard
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    list
+        The bitboard with the assigned values eliminated from peers
+    """
+    peers = (tables or tables_for(board)).peers
+    solved = [(idx, mask) for idx, mask in enumerate(board) if mask and not mask & (mask - 1)]
+    for idx, mask in solved:
+        keep = ~mask
+        for peer in peers[idx]:
+            board[peer] &= keep
+    return board
+
+
+def only_choice(board, tables=None):
+    """Apply the only choice strategy to a bitboard
+
+    Digits that appear in exactly one box of a unit are found for the whole
+    unit at once by accumulating the digits seen once and seen more than once.
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    list
+        The bitboard with all single-place digits assigned
+    """
+    for unit in (tables or tables_for(board)).units:
+        once = twice = 0
+        for idx in unit:
+            mask = board[idx]
+            twice |= once & mask
+            once |= mask
+        unique = once & ~twice
+        if unique:
+            for idx in unit:
+                mask = board[idx] & unique
+                if mask:
+                    board[idx] = mask
+    return board
+
+
+def naked_twins(board, tables=None):
+    """Eliminate values using the naked twins strategy on a bitboard
+
+    Like solution.naked_twins, the input board is treated as immutable so
+    that every pair of twins in the input is processed.
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    list
+        A new bitboard with the naked twins eliminated from peers
+    """
+    tables = tables or tables_for(board)
+    peers, peer_masks = tables.peers, tables.peer_masks
+    out = board[:]
+    for boxA, mask in enumerate(board):
+        if popcount(mask) != 2:
+            continue
+        keep = ~mask
+        for boxB in peers[boxA]:
+            if boxB > boxA and board[boxB] == mask:
+                common = peer_masks[boxA] & peer_masks[boxB]
+                while common:
+                    low = common & -common
+                    out[low.bit_length() - 1] &= keep
+                    common ^= low
+    return out
+
+
+def propagate(board, tables=None, changed=None, trail=None):
+    """Propagate constraints from the boxes in `changed` until nothing changes
+
+    This is an AC-3 style worklist version of the eliminate, only choice and
+    naked twins strategies: boxes that become solved are queued to eliminate
+    their digit from their peers, and units containing a box whose candidates
+    changed are queued to be checked for only choices and naked twins. Only
+    the units touched by a change are re-examined, and the board is abandoned
+    as soon as any box has no candidates left or any digit has no place left
+    in a unit.
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box (updated in place)
+
+    changed(iterable)
+        the indices of the boxes whose candidates changed since the board was
+        last consistent; by default every box is treated as changed
+
+    trail(list)
+        if given, an (index, old mask) pair is appended for every box that is
+        updated, so that the changes can be undone (see search_trail)
+
+    Returns
+    -------
+    list or False
+        The propagated bitboard, or False if a contradiction was found
+    """
+    tables = tables or tables_for(board)
+    peers, units, box_units = tables.peers, tables.units, tables.box_units
+    size, full = tables.size, all_digits(tables)
+    singles = []
+    unit_queue = []
+    queued = bytearray(len(units))
+
+    def touch(idx, mask):
+        if not mask & (mask - 1):
+            singles.append(idx)
+        for u in box_units[idx]:
+            if not queued[u]:
+                queued[u] = 1
+                unit_queue.append(u)
+
+    for idx in (range(len(board)) if changed is None else changed):
+        if not board[idx]:
+            return False
+        touch(idx, board[idx])
+
+    while singles or unit_queue:
+        while singles:
+            idx = singles.pop()
+            mask = board[idx]
+            keep = ~mask
+            for peer in peers[idx]:
+                peer_mask = board[peer]
+                if peer_mask & mask:
+                    peer_mask &= keep
+                    if not peer_mask:
+                        return False
+                    if trail is not None:
+                        trail.append((peer, board[peer]))
+                    board[peer] = peer_mask
+                    touch(peer, peer_mask)
+        if not unit_queue:
+            break
+        u = unit_queue.pop()
+        queued[u] = 0
+        unit = units[u]
+
+        # only choice: digits seen exactly once in the unit
+        once = twice = 0
+        for idx in unit:
+            mask = board[idx]
+            twice |= once & mask
+            once |= mask
+        if once != full and len(unit) == size:
+            return False
+        unique = once & ~twice
+        if unique:
+            for idx in unit:
+                mask = board[idx]
+                hit = mask & unique
+                if hit:
+                    if hit & (hit - 1):
+                        return False
+                    if hit != mask:
+                        if trail is not None:
+                            trail.append((idx, mask))
+                        board[idx] = hit
+                        touch(idx, hit)
+
+        # naked twins: two boxes of the unit sharing the same two candidates
+        pairs = {}
+        for idx in unit:
+            mask = board[idx]
+            rest = mask & (mask - 1)
+            if rest and not rest & (rest - 1):
+                if mask in pairs:
+                    twin = pairs[mask]
+                    keep = ~mask
+                    for other in unit:
+                        other_mask = board[other]
+                        if other != idx and other != twin and other_mask & mask:
+                            other_mask &= keep
+                            if not other_mask:
+                                return False
+                            if trail is not None:
+                                trail.append((other, board[other]))
+                            board[other] = other_mask
+                            touch(other, other_mask)
+                else:
+                    pairs[mask] = idx
+    return board
+
+
+def reduce_puzzle(board, tables=None):
+    """Reduce a bitboard by applying all constraint strategies until no more
+    progress is possible (see propagate)
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    list or False
+        The bitboard after continued application of the constraint strategies
+        no longer produces any changes, or False if the puzzle is unsolvable
+    """
+    return propagate(board, tables)
+
+
+def search(board, tables=None, stats=None):
+    """Apply depth first search with constraint propagation to a bitboard
+
+    The board is fully reduced once; after that each branch only propagates
+    the consequences of the box assigned by the branch.
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    stats(strategies.SolverStats)
+        if given, the propagate calls (as passes and as the 'propagate'
+        strategy), branches, backtracks and maximum depth are added to it
+
+    Returns
+    -------
+    list or False
+        The bitboard with all boxes assigned or False
+    """
+    tables = tables or tables_for(board)
+    if stats is None:
+        board = reduce_puzzle(board, tables)
+    else:
+        board = _profiled_propagate(board, tables, None, None, stats)
+    if board is False:
+        return False
+    return _search(board, tables, stats)
+
+
+def _profiled_propagate(board, tables, changed, trail, stats):
+    before, start = sum(map(popcount, board)), timer()
+    result = propagate(board, tables, changed, trail)
+    removed = before - sum(map(popcount, board)) if result is not False else 0
+    stats.passes += 1
+    stats.record('propagate', removed, timer() - start)
+    return result
+
+
+def _search(board, tables, stats=None, depth=0):
+    best, fewest = None, tables.size + 1
+    for idx, mask in enumerate(board):
+        count = popcount(mask)
+        if 1 < count < fewest:
+            best, fewest = idx, count
+            if count == 2:
+                break
+    if best is None:
+        return board
+    mask = board[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        attempt = board[:]
+        attempt[best] = bit
+        if stats is None:
+            consistent = propagate(attempt, tables, (best,)) is not False
+        else:
+            stats.branch(depth + 1)
+            consistent = _profiled_propagate(attempt, tables, (best,), None, stats) is not False
+        if consistent:
+            attempt = _search(attempt, tables, stats, depth + 1)
+            if attempt:
+                return attempt
+        if stats is not None:
+            stats.backtracks += 1
+    return False
+
+
+def search_trail(board, tables=None, stats=None):
+    """Apply depth first search to a bitboard without copying it per branch
+
+    The board is updated in place. Every change made by a branch is recorded
+    on an undo trail of (index, old mask) pairs, and the board is restored
+    from the trail when the branch fails. Branches are taken on the box with
+    the fewest candidates (MRV), breaking ties by the most unsolved peers.
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box (updated in place)
+
+    stats(strategies.SolverStats)
+        if given, search counters are added to it (see search)
+
+    Returns
+    -------
+    list or False
+        The bitboard with all boxes assigned or False
+    """
+    tables = tables or tables_for(board)
+    if stats is None:
+        reduced = reduce_puzzle(board, tables)
+    else:
+        reduced = _profiled_propagate(board, tables, None, None, stats)
+    if reduced is False:
+        return False
+    return board if _search_trail(board, tables, [], stats) else False
+
+
+def select_box(board, tables):
+    """Return the unsolved box with the fewest candidates, breaking ties by the
+    largest number of unsolved peers (or None if every box is solved)
+    """
+    fewest, tied = tables.size + 1, []
+    for idx, mask in enumerate(board):
+        if mask & (mask - 1):
+            count = popcount(mask)
+            if count < fewest:
+                fewest, tied = count, [idx]
+            elif count == fewest:
+                tied.append(idx)
+    if len(tied) < 2:
+        return tied[0] if tied else None
+    peers = tables.peers
+    best, degree = None, -1
+    for idx in tied:
+        d = 0
+        for peer in peers[idx]:
+            mask = board[peer]
+            if mask & (mask - 1):
+                d += 1
+        if d > degree:
+            best, degree = idx, d
+    return best
+
+
+def _search_trail(board, tables, trail, stats=None, depth=0):
+    best = select_box(board, tables)
+    if best is None:
+        return True
+    mask = board[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        mark = len(trail)
+        trail.append((best, board[best]))
+        board[best] = bit
+        if stats is None:
+            consistent = propagate(board, tables, (best,), trail) is not False
+        else:
+            stats.branch(depth + 1)
+            consistent = _profiled_propagate(board, tables, (best,), trail, stats) is not False
+        if consistent and _search_trail(board, tables, trail, stats, depth + 1):
+            return True
+        if stats is not None:
+            stats.backtracks += 1
+        while len(trail) > mark:
+            idx, old = trail.pop()
+            board[idx] = old
+    return False
+
+
+def solve(grid, tables=None, trail=False, stats=None):
+    """Find the solution to a Sudoku puzzle using the bitboard strategies
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid; 9x9, 16x16 and 25x25 grids are
+        all supported.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    trail(bool)
+        use search_trail (one board updated in place with an undo trail)
+        instead of copying the board for every branch
+
+    stats(strategies.SolverStats)
+        if given, search counters are added to it (see search)
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    tables = tables or tables_for(grid)
+    board = (search_trail if trail else search)(grid2bits(grid, tables), tables, stats)
+    return bits2values(board, tables) if board else False
@@ -0,0 +1,201 @@
+"""Solution counting with an early cutoff
+
+Counting stops as soon as `limit` solutions are found, so checking that a
+puzzle has a unique solution (limit=2) never enumerates more than two. The
+search is the in-place bitboard search from bitboard.py (MRV branching with an
+undo trail), continued past the first solution.
+
+Heavy instances (e.g., a nearly empty 16x16 board) can be split: the top of
+the search tree is expanded breadth first into independent subproblems that
+are counted on a process pool, and the remaining work is cancelled once the
+limit is reached.
+"""
+import os
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Event
+
+import bitboard
+
+
+CHECK_INTERVAL = 256  # search nodes between checks of the shared stop flag
+
+_stop = None  # set in worker processes by _init_worker
+
+
+def count(board, tables=None, limit=2, stop=None):
+    """Count the solutions of a bitboard, stopping at `limit`
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box (updated in place)
+
+    limit(int)
+        the number of solutions to stop at (None counts every solution)
+
+    stop(multiprocessing.Event)
+        if given, the search is abandoned soon after the event is set
+
+    Returns
+    -------
+    int
+        The number of solutions found (at most limit)
+
+    Raises
+    ------
+    ValueError
+        If limit is less than 1
+    """
+    _check_limit(limit)
+    tables = tables or bitboard.tables_for(board)
+    if bitboard.reduce_puzzle(board, tables) is False:
+        return 0
+    state = _Counter(tables, float('inf') if limit is None else limit, stop)
+    state.visit(board, [])
+    return state.found
+
+
+def _check_limit(limit):
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1 (or None to count every solution)")
+
+
+class _Counter:
+    def __init__(self, tables, limit, stop):
+        self.tables = tables
+        self.limit = limit
+        self.stop = stop
+        self.found = 0
+        self.nodes = 0
+
+    def done(self):
+        if self.found >= self.limit:
+            return True
+        self.nodes += 1
+        if self.stop is not None and self.nodes % CHECK_INTERVAL == 0 and self.stop.is_set():
+            self.limit = self.found
+            return True
+        return False
+
+    def visit(self, board, trail):
+        best = bitboard.select_box(board, self.tables)
+        if best is None:
+            self.found += 1
+            return
+        mask = board[best]
+        while mask and not self.done():
+            bit = mask & -mask
+            mask ^= bit
+            mark = len(trail)
+            trail.append((best, board[best]))
+            board[best] = bit
+            if bitboard.propagate(board, self.tables, (best,), trail) is not False:
+                self.visit(board, trail)
+            while len(trail) > mark:
+                idx, old = trail.pop()
+                board[idx] = old
+
+
+def split(board, tables, parts):
+    """Expand the top of the search tree until there are at least `parts`
+    subproblems (or nothing left to branch on)
+
+    Returns
+    -------
+    (int, list)
+        The number of solutions found while expanding, and the reduced
+        bitboards of the open subproblems
+    """
+    solved, frontier = 0, deque([board])
+    while frontier and len(frontier) < parts:
+        board = frontier.popleft()
+        best = bitboard.select_box(board, tables)
+        if best is None:
+            solved += 1
+            continue
+        mask = board[best]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            child = board[:]
+            child[best] = bit
+            if bitboard.propagate(child, tables, (best,)) is not False:
+                frontier.append(child)
+    return solved, list(frontier)
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _count_part(board, tables, limit):
+    return count(board, tables, limit, _stop)
+
+
+def count_solutions(grid, limit=2, tables=None, workers=1, parts=None, diagonal=False):
+    """Count the solutions of a Sudoku grid, stopping once `limit` are found
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid (9x9, 16x16 or 25x25)
+
+    limit(int)
+        the number of solutions to stop at; count_solutions(grid) == 1 checks
+        that a puzzle has a unique solution (None counts every solution)
+
+    tables(BoardTables)
+        the units to count solutions for; defaults to board_tables for the
+        order of the grid, with or without the diagonals as given by diagonal
+
+    workers(int)
+        the number of worker processes; with more than one the search tree is
+        split into subproblems that are counted in parallel (None uses
+        os.cpu_count())
+
+    parts(int)
+        the number of subproblems to split the tree into (default 8 * workers)
+
+    diagonal(bool)
+        whether the two main diagonals are units (False by default, which
+        counts the solutions under the standard rules, as in batch.py)
+
+    Returns
+    -------
+    int
+        The number of solutions found (at most limit)
+
+    Raises
+    ------
+    ValueError
+        If limit is less than 1
+    """
+    _check_limit(limit)
+    tables = tables or bitboard.tables_for(grid, diagonal)
+    board = bitboard.grid2bits(grid, tables)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return count(board, tables, limit)
+
+    if bitboard.reduce_puzzle(board, tables) is False:
+        return 0
+    found, subproblems = split(board, tables, parts or 8 * workers)
+    if not subproblems or (limit is not None and found >= limit):
+        return found if limit is None else min(found, limit)
+
+    stop = Event()
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(stop,))
+    try:
+        pending = {pool.submit(_count_part, part, tables, limit) for part in subproblems}
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            found += sum(future.result() for future in finished)
+            if limit is not None and found >= limit:
+                stop.set()
+                return limit
+        return found
+    finally:
+        pool.shutdown(cancel_futures=True)
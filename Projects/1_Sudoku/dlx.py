@@ -0,0 +1,158 @@
+"""Exact cover (Algorithm X) backend for the Sudoku solver
+
+A Sudoku board is an exact cover problem: every (box, digit) choice is a row
+that covers one "box has a digit" column plus one "unit has digit d" column for
+each unit that contains the box. The units come from the same BoardTables used
+by bitboard.py, so 9x9 boards share solution.unitlist (including the diagonal
+units) and larger boards use the standard units for their order.
+
+Algorithm X is implemented with the dict-of-sets form of Dancing Links:
+columns map to the set of rows that cover them, and covering a column removes
+its rows from every other column and restores them in reverse order when
+backtracking, exactly as the linked-list version unlinks and relinks nodes.
+"""
+import bitboard
+
+
+_row_columns = {}
+
+
+def _columns(tables):
+    """Build (once per tables) the columns covered by each (box, digit) row
+
+    Rows are numbered box * size + digit; the first len(boxes) columns are the
+    box columns, followed by size columns for each unit.
+    """
+    key = id(tables)
+    if key not in _row_columns:
+        size, n = tables.size, len(tables.boxes)
+        rows = []
+        for idx in range(n):
+            unit_ids = tables.box_units[idx]
+            for d in range(size):
+                rows.append((idx,) + tuple(n + u * size + d for u in unit_ids))
+        _row_columns[key] = (tables, rows)
+    return _row_columns[key][1]
+
+
+def exact_cover(board, tables=None):
+    """Build the exact cover matrix for the candidates remaining on a bitboard
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Returns
+    -------
+    (dict, list)
+        X maps each column to the set of rows that cover it, and Y lists the
+        columns covered by each row
+    """
+    tables = tables or bitboard.tables_for(board)
+    Y = _columns(tables)
+    size = tables.size
+    X = {col: set() for col in range(len(board) + len(tables.units) * size)}
+    for idx, mask in enumerate(board):
+        for d in range(size):
+            if mask >> d & 1:
+                row = idx * size + d
+                for col in Y[row]:
+                    X[col].add(row)
+    return X, Y
+
+
+def _select(X, Y, row):
+    removed = []
+    for j in Y[row]:
+        for i in X[j]:
+            for k in Y[i]:
+                if k != j:
+                    X[k].discard(i)
+        removed.append(X.pop(j))
+    return removed
+
+
+def _deselect(X, Y, row, removed):
+    for j in reversed(Y[row]):
+        X[j] = removed.pop()
+        for i in X[j]:
+            for k in Y[i]:
+                if k != j:
+                    X[k].add(i)
+
+
+def _algorithm_x(X, Y, partial):
+    if not X:
+        yield partial
+        return
+    col = min(X, key=lambda c: len(X[c]))
+    for row in list(X[col]):
+        partial.append(row)
+        removed = _select(X, Y, row)
+        yield from _algorithm_x(X, Y, partial)
+        _deselect(X, Y, row, removed)
+        partial.pop()
+
+
+def search_all(board, tables=None):
+    """Enumerate every solution of a bitboard
+
+    Parameters
+    ----------
+    board(list)
+        a list of ints with one candidate bitmask per box
+
+    Yields
+    ------
+    list
+        a solved bitboard for each distinct solution
+    """
+    tables = tables or bitboard.tables_for(board)
+    size = tables.size
+    X, Y = exact_cover(board, tables)
+    for rows in _algorithm_x(X, Y, []):
+        solved = [0] * len(board)
+        for row in rows:
+            solved[row // size] = 1 << (row % size)
+        yield solved
+
+
+def enumerate_solutions(grid, tables=None):
+    """Enumerate every solution of a Sudoku grid
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Yields
+    ------
+    str
+        each solution as a grid string
+    """
+    tables = tables or bitboard.tables_for(grid)
+    for solved in search_all(bitboard.grid2bits(grid, tables), tables):
+        yield bitboard.bits2grid(solved, tables)
+
+
+def solve(grid, tables=None):
+    """Find the solution to a Sudoku puzzle with Algorithm X
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    tables = tables or bitboard.tables_for(grid)
+    solved = next(search_all(bitboard.grid2bits(grid, tables), tables), None)
+    return bitboard.bits2values(solved, tables) if solved else False
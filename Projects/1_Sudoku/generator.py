@@ -0,0 +1,227 @@
+"""Parallel generation of Sudoku puzzles with a unique solution
+
+Each puzzle starts from a random solved board for the units in
+solution.unitlist (so the puzzles are diagonal Sudoku puzzles), and clues are
+removed in random order as long as the puzzle keeps a unique solution, until
+the target clue count is reached. Puzzles are graded by whether constraint
+propagation alone solves them, and candidates of the wrong difficulty are
+thrown away.
+
+Generation runs on a process pool in chunks; every chunk has its own seed
+drawn from the master seed, so the output only depends on the seed and the
+chunk size, not on the number of workers or the order they finish in.
+
+    $ python generator.py -n 1000 --clues 28 --difficulty hard -j 8 --seed 1 -o puzzles.txt
+"""
+import argparse
+import os
+import random
+import sys
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import counting
+import solution
+import symmetry
+
+from utils import cols
+
+
+DIFFICULTIES = ('easy', 'hard', 'any')
+
+
+def random_solution(rng, max_attempts=100, max_nodes=10000):
+    """Return a random solved grid
+
+    A random permutation of the digits is placed on the main diagonal (where no
+    two boxes share a row, column or square) and the rest of the board is
+    filled by a depth first search that tries the candidates of every box in a
+    random order; a random symmetry of the board and relabeling of the digits
+    are then applied. A search that visits more than max_nodes boards is
+    abandoned and restarted from a new diagonal.
+
+    Raises
+    ------
+    RuntimeError
+        If none of max_attempts searches finds a solution
+    """
+    tables = bitboard.DEFAULT_TABLES
+    for _ in range(max_attempts):
+        digits = rng.sample(cols, len(cols))
+        grid = ['.'] * len(solution.boxes)
+        for r, digit in enumerate(digits):
+            grid[r * len(cols) + r] = digit
+        board = bitboard.reduce_puzzle(bitboard.grid2bits(''.join(grid), tables), tables)
+        solved = board and _random_fill(board, tables, rng, [max_nodes])
+        if solved:
+            break
+    else:
+        raise RuntimeError("no solution found in {} attempts of {} nodes".format(
+            max_attempts, max_nodes))
+    src = rng.choice(symmetry.transforms())
+    return symmetry.restore(bitboard.bits2grid(solved, tables), src,
+                            ''.join(rng.sample(cols, len(cols))))
+
+
+def _random_fill(board, tables, rng, budget):
+    """ Depth first search over the candidates of each box in random order """
+    best = bitboard.select_box(board, tables)
+    if best is None:
+        return board
+    mask, bits = board[best], []
+    while mask:
+        bits.append(mask & -mask)
+        mask &= mask - 1
+    rng.shuffle(bits)
+    for bit in bits:
+        budget[0] -= 1
+        if budget[0] < 0:
+            return False
+        child = board[:]
+        child[best] = bit
+        if bitboard.propagate(child, tables, (best,)) is not False:
+            solved = _random_fill(child, tables, rng, budget)
+            if solved:
+                return solved
+    return False
+
+
+def has_unique_solution(grid):
+    """ Return True if the grid has exactly one solution """
+    return counting.count_solutions(grid, limit=2, diagonal=True) == 1
+
+
+def grade(grid):
+    """Grade a puzzle as 'easy' (solved by reduce_puzzle alone) or 'hard'"""
+    board = bitboard.reduce_puzzle(bitboard.grid2bits(grid))
+    return 'easy' if board and all(mask & (mask - 1) == 0 for mask in board) else 'hard'
+
+
+def dig(solved, clues, rng):
+    """Remove clues from a solved grid while the solution stays unique
+
+    Returns
+    -------
+    str or None
+        A puzzle with `clues` givens, or None if every remaining clue is
+        needed before the target is reached
+    """
+    grid = list(solved)
+    remaining = len(grid)
+    for idx in rng.sample(range(len(grid)), len(grid)):
+        if remaining == clues:
+            break
+        digit, grid[idx] = grid[idx], '.'
+        if has_unique_solution(''.join(grid)):
+            remaining -= 1
+        else:
+            grid[idx] = digit
+    return ''.join(grid) if remaining == clues else None
+
+
+def generate(clues, difficulty='any', rng=random, max_attempts=1000):
+    """Generate one puzzle with a unique solution
+
+    Parameters
+    ----------
+    clues(int)
+        The number of givens in the puzzle
+
+    difficulty(str)
+        One of DIFFICULTIES
+
+    rng(random.Random)
+        The source of randomness
+
+    Returns
+    -------
+    str or None
+        The puzzle grid, or None if no puzzle matched within max_attempts
+    """
+    if difficulty not in DIFFICULTIES:
+        raise ValueError("unknown difficulty {!r}".format(difficulty))
+    for _ in range(max_attempts):
+        grid = dig(random_solution(rng), clues, rng)
+        if grid and (difficulty == 'any' or grade(grid) == difficulty):
+            return grid
+    return None
+
+
+def generate_chunk(seed, count, clues, difficulty):
+    """ Generate `count` puzzles from a fresh random.Random(seed) """
+    rng = random.Random(seed)
+    return [generate(clues, difficulty, rng) for _ in range(count)]
+
+
+def generate_stream(count, clues, difficulty='any', workers=None, chunksize=16, seed=None):
+    """Generate puzzles on a process pool, yielding them as chunks complete
+
+    At most a few chunks per worker are in flight at any time, and the chunks
+    are yielded in order, so the output for a given seed is reproducible.
+
+    Parameters
+    ----------
+    count : int
+        The number of puzzles to generate
+
+    clues, difficulty
+        See generate()
+
+    workers : int
+        The number of worker processes (defaults to os.cpu_count()); with a
+        single worker the puzzles are generated in the calling process
+
+    chunksize : int
+        The number of puzzles generated by each task
+
+    seed : int
+        The master seed that the seed of every chunk is drawn from
+
+    Yields
+    ------
+    str or None
+        Each generated puzzle (None where a chunk gave up after max_attempts)
+    """
+    workers = workers or os.cpu_count() or 1
+    master = random.Random(seed)
+    tasks = ((master.getrandbits(64), min(chunksize, count - start), clues, difficulty)
+             for start in range(0, count, chunksize))
+    if workers == 1:
+        for task in tasks:
+            yield from generate_chunk(*task)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(generate_chunk, *task))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique " +
+        "solution, one 81-character grid per line.")
+    parser.add_argument('-n', '--count', type=int, default=100, help="The number of puzzles")
+    parser.add_argument('--clues', type=int, default=30, help="The number of givens in each puzzle")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='any',
+                        help="'easy' puzzles are solved by constraint propagation alone, " +
+                             "'hard' puzzles need search")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="The master random seed")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="The number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument('-c', '--chunksize', type=int, default=16,
+                        help="The number of puzzles generated by each task")
+    parser.add_argument('-o', '--output', type=argparse.FileType('w'), default=sys.stdout,
+                        help="The file to write puzzles to (defaults to stdout)")
+    args = parser.parse_args()
+
+    for puzzle in generate_stream(args.count, args.clues, args.difficulty, args.workers,
+                                  args.chunksize, args.seed):
+        if puzzle:
+            args.output.write(puzzle + "\n")
+            args.output.flush()
@@ -41,20 +41,19 @@ def AAfilledRoundedRect(surface,rect,color,radius=0.4):
 
     return surface.blit(rectangle,pos)
 
+_fonts = {}
+
+def squareFont():
+    """The font shared by every square (SysFont lookups are slow)."""
+    if 'square' not in _fonts:
+        _fonts['square'] = pygame.font.SysFont('opensans', 21)
+    return _fonts['square']
+
 class SudokuSquare:
     """A sudoku square class."""
     def __init__(self, number=None, offsetX=0, offsetY=0, edit="Y", xLoc=0, yLoc=0):
-        if number != None:
-            number = str(number)
-            self.color = (2, 204, 186)
-        else:
-            number = ""
-            self.color = (255, 255, 255)
         # print("FONTS", pygame.font.get_fonts())
-        self.font = pygame.font.SysFont('opensans', 21)
-        self.text = self.font.render(number, 1, (255, 255, 255))
-        self.textpos = self.text.get_rect()
-        self.textpos = self.textpos.move(offsetX + 17, offsetY + 4)
+        self.font = squareFont()
 
         # self.collide = pygame.Surface((25, 22))
         # self.collide = self.collide.convert()
@@ -69,6 +68,22 @@ class SudokuSquare:
         self.yLoc = yLoc
         self.offsetX = offsetX
         self.offsetY = offsetY
+        self.setNumber(number)
+
+    def setNumber(self, number):
+        """Show a new number (or None for an empty square) in place."""
+        if number != None:
+            number = str(number)
+            self.color = (2, 204, 186)
+        else:
+            number = ""
+            self.color = (255, 255, 255)
+        self.text = self.font.render(number, 1, (255, 255, 255))
+        self.textpos = self.text.get_rect()
+        self.textpos = self.textpos.move(self.offsetX + 17, self.offsetY + 4)
+
+    def rect(self):
+        return Rect(self.offsetX, self.offsetY, 45, 40)
 
     def draw(self):
         screen = pygame.display.get_surface()
@@ -0,0 +1,267 @@
+"""A local Sudoku solving server
+
+Clients connect over TCP or a Unix socket and send one 81-character grid per
+line ('.' or '0' for empty boxes); the server answers every line with
+'<line> <result>', where <line> is the line number of the request on that
+connection (counting from 1, blank lines included) and <result> is the solved
+grid, 'unsolvable', or 'error: <reason>'. Each reply is written as soon as its
+puzzle is solved, so a hard puzzle never holds back the easy ones sent after
+it and replies can arrive in any order; clients match them up by line number
+and can keep streaming puzzles on one connection.
+
+Puzzles from all connections are collected into micro-batches (up to
+`batch_size` puzzles, or whatever has arrived after `batch_delay` seconds)
+that are solved with solution.solve on a pool of worker processes, so the
+interpreter startup and imports are paid once per worker instead of once per
+puzzle. Backpressure keeps memory bounded: each connection can have at most
+`max_inflight` unanswered puzzles, at most `max_pending` puzzles wait for a
+batch across all connections, and at most two batches per worker are queued
+on the pool. When a limit is reached the server stops reading from the
+connection, which in turn stalls the client's writes.
+
+Puzzles are solved with the standard rules by default; pass --diagonal to
+also require both main diagonals to hold every digit (the same default and
+flag as batch.py).
+
+    $ python server.py --port 8765 -j 4
+    $ python server.py --unix /tmp/sudoku.sock --diagonal
+    $ cat puzzles.txt | nc localhost 8765
+"""
+import argparse
+import asyncio
+import functools
+import multiprocessing
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import dlx
+import solution
+
+from utils import board_tables, values2grid
+
+
+UNSOLVABLE = 'unsolvable'
+
+
+def solve_batch(grids, backend, diagonal=False):
+    """Solve a batch of grids in a worker process, returning result lines in order
+
+    Diagonal puzzles are solved with solution.solve (and its cache); puzzles
+    with the standard rules are solved with the units of board_tables(3),
+    which the 'search' backend does not support.
+    """
+    tables = board_tables(3, diagonal=diagonal)
+    results = []
+    for grid in grids:
+        if diagonal:
+            values = solution.solve(grid, backend)
+        elif backend == 'dlx':
+            values = dlx.solve(grid, tables)
+        else:
+            values = bitboard.solve(grid, tables, trail=backend == 'trail')
+        results.append(values2grid(values) if values else UNSOLVABLE)
+    return results
+
+
+def parse_grid(line):
+    """Normalize a request line, returning the grid or None if it is not a grid"""
+    grid = line.strip().replace('0', '.')
+    if len(grid) != len(solution.boxes) or any(c not in '.123456789' for c in grid):
+        return None
+    return grid
+
+
+class SudokuServer:
+    """Micro-batching solver service
+
+    Parameters
+    ----------
+    workers : int
+        The number of worker processes (defaults to os.cpu_count())
+
+    backend : str
+        The solution.solve backend used by the workers ('search' requires
+        diagonal=True)
+
+    diagonal : bool
+        Whether the two main diagonals are units (False by default, which
+        solves the puzzles with the standard rules)
+
+    batch_size : int
+        The largest number of puzzles sent to a worker at once
+
+    batch_delay : float
+        How long (in seconds) to wait for more puzzles before sending a
+        partial batch
+
+    max_inflight : int
+        The most unanswered puzzles allowed per connection
+
+    max_pending : int
+        The most puzzles allowed to wait for a batch across all connections
+    """
+    def __init__(self, workers=None, backend='bitboard', batch_size=64, batch_delay=0.002,
+                 max_inflight=256, max_pending=4096, diagonal=False):
+        if backend not in solution.BACKENDS:
+            raise ValueError("unknown backend {!r}".format(backend))
+        if backend == 'search' and not diagonal:
+            raise ValueError("the 'search' backend only solves diagonal sudoku")
+        self.diagonal = diagonal
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_inflight = max_inflight
+        self.max_pending = max_pending
+        self.solved = 0
+        self.batches = 0
+        self.tasks = set()
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Start serving on a TCP port (port 0 picks a free one) or on a Unix
+        socket path, returning the asyncio server
+        """
+        # workers forked after a client connects would inherit its socket and
+        # keep the connection open after the server closes it, so the workers
+        # are started from a fresh interpreter instead
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self.queue = asyncio.Queue(self.max_pending)
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        self.batcher = asyncio.ensure_future(self._batch_loop())
+        if path:
+            self.server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def close(self):
+        """ Stop accepting connections, finish the running batches and stop the workers """
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        await asyncio.gather(self.batcher, *self.tasks, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self.pool.shutdown, cancel_futures=True))
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            await self.slots.acquire()
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            grids = [grid for grid, _ in batch]
+            results = await loop.run_in_executor(self.pool, solve_batch, grids,
+                                                 self.backend, self.diagonal)
+        except Exception as e:
+            results = ["error: {}".format(e)] * len(batch)
+        finally:
+            self.slots.release()
+        self.batches += 1
+        self.solved += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        inflight = asyncio.Semaphore(self.max_inflight)
+        finished = asyncio.Queue()  # (line number, result) pairs, or None when there are none left
+        unanswered = 0
+        done = False
+
+        def reply(lineno, future):
+            finished.put_nowait((lineno, future.result()))
+
+        async def write_results():
+            nonlocal unanswered
+            while True:
+                item = await finished.get()
+                if item is None:
+                    return
+                unanswered -= 1
+                inflight.release()
+                writer.write("{} {}\n".format(*item).encode())
+                await writer.drain()
+                if done and not unanswered:
+                    return
+
+        responder = asyncio.ensure_future(write_results())
+        try:
+            lineno = 0
+            async for line in reader:
+                lineno += 1
+                if not line.strip():
+                    continue
+                await inflight.acquire()
+                unanswered += 1
+                future = loop.create_future()
+                future.add_done_callback(functools.partial(reply, lineno))
+                grid = parse_grid(line.decode(errors='replace'))
+                if grid is None:
+                    future.set_result("error: expected an 81-character grid")
+                else:
+                    await self.queue.put((grid, future))
+        finally:
+            done = True
+            if not unanswered:
+                finished.put_nowait(None)
+            try:
+                await responder
+            except ConnectionError:
+                pass
+            writer.close()
+
+
+async def serve(host, port, path, **options):
+    server = SudokuServer(**options)
+    await server.start(host, port, path)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Sudoku solutions over TCP or a Unix " +
+        "socket: send one grid per line, receive one numbered solution per line.")
+    parser.add_argument('--host', default='127.0.0.1', help="The address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="The TCP port to listen on")
+    parser.add_argument('--unix', default=None, help="Listen on this Unix socket path instead")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="The number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument('--backend', choices=solution.BACKENDS, default='bitboard',
+                        help="The solution.solve backend")
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help="The largest number of puzzles solved per batch")
+    parser.add_argument('--batch-delay', type=float, default=0.002,
+                        help="Seconds to wait for a batch to fill up")
+    parser.add_argument('--max-inflight', type=int, default=256,
+                        help="The most unanswered puzzles per connection")
+    parser.add_argument('--max-pending', type=int, default=4096,
+                        help="The most puzzles waiting for a batch across all connections")
+    parser.add_argument('--diagonal', action='store_true',
+                        help="Also treat the two main diagonals as units (by default " +
+                        "puzzles are solved with the standard rules)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, workers=args.workers,
+                          backend=args.backend, batch_size=args.batch_size,
+                          batch_delay=args.batch_delay, max_inflight=args.max_inflight,
+                          max_pending=args.max_pending, diagonal=args.diagonal))
+    except KeyboardInterrupt:
+        pass
@@ -1,14 +1,20 @@
 
+from functools import lru_cache
+from timeit import default_timer as timer
+
 from utils import *
 
+from symmetry import SolutionCache
+
 
 row_units = [cross(r, cols) for r in rows]
 column_units = [cross(rows, c) for c in cols]
-square_units = [cross(rs, cs) for rs in ('ABC','DEF','GHI') for cs in ('123','456','789')]
+square_units = [cross(rows[r:r + order], cols[c:c + order])
+                for r in range(0, len(rows), order) for c in range(0, len(cols), order)]
 unitlist = row_units + column_units + square_units
 
-# TODO: Update the unit list to add the new diagonal units
-unitlist = unitlist
+diagonal_units = [[r + c for r, c in zip(rows, cols)], [r + c for r, c in zip(rows, cols[::-1])]]
+unitlist = unitlist + diagonal_units
 
 
 # Must be called after all units (including diagonals) are added to the unitlist
@@ -53,8 +59,16 @@ def naked_twins(values):
     Pseudocode for this algorithm on github:
     https://github.com/udacity/artificial-intelligence/blob/master/Projects/1_Sudoku/pseudocode.md
     """
-    # TODO: Implement this function!
-    raise NotImplementedError
+    out = values.copy()
+    for boxA in values:
+        if len(values[boxA]) != 2:
+            continue
+        for boxB in peers[boxA]:
+            if values[boxA] == values[boxB]:
+                for peer in peers[boxA] & peers[boxB]:
+                    for digit in values[boxA]:
+                        assign_value(out, peer, out[peer].replace(digit, ''))
+    return out
 
 
 def eliminate(values):
@@ -73,8 +87,12 @@ def eliminate(values):
     dict
         The values dictionary with the assigned values eliminated from peers
     """
-    # TODO: Copy your code from the classroom to complete this function
-    raise NotImplementedError
+    solved_values = [box for box in values.keys() if len(values[box]) == 1]
+    for box in solved_values:
+        digit = values[box]
+        for peer in peers[box]:
+            assign_value(values, peer, values[peer].replace(digit, ''))
+    return values
 
 
 def only_choice(values):
@@ -97,11 +115,26 @@ def only_choice(values):
     -----
     You should be able to complete this function by copying your code from the classroom
     """
-    # TODO: Copy your code from the classroom to complete this function
-    raise NotImplementedError
+    for unit in unitlist:
+        for digit in cols:
+            dplaces = [box for box in unit if digit in values[box]]
+            if len(dplaces) == 1:
+                assign_value(values, dplaces[0], digit)
+    return values
+
+
+STRATEGIES = ['eliminate', 'hidden_singles', 'naked_twins']  # the default strategies, in order
 
 
-def reduce_puzzle(values):
+@lru_cache()
+def _pipeline(names):
+    """ Look up the (name, function) pairs of a tuple of strategy names once """
+    # strategies.py registers functions of this module, so it is imported on first use
+    from strategies import lookup
+    return lookup(names)
+
+
+def reduce_puzzle(values, strategies=None, stats=None):
     """Reduce a Sudoku puzzle by repeatedly applying all constraint strategies
 
     Parameters
@@ -109,17 +142,41 @@ def reduce_puzzle(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    strategies(list)
+        the names of the strategies to apply, in order (see strategies.py);
+        defaults to STRATEGIES
+
+    stats(strategies.SolverStats)
+        if given, the number of passes and the calls, removed candidates and
+        time of each strategy are added to it
+
     Returns
     -------
     dict or False
         The values dictionary after continued application of the constraint strategies
         no longer produces any changes, or False if the puzzle is unsolvable 
     """
-    # TODO: Copy your code from the classroom and modify it to complete this function
-    raise NotImplementedError
+    pipeline = _pipeline(tuple(strategies or STRATEGIES))
+    stalled = False
+    while not stalled:
+        candidates_before = count_candidates(values)
+        if stats is not None:
+            stats.passes += 1
+        for name, strategy in pipeline:
+            if stats is None:
+                values = strategy(values)
+            else:
+                before, start = count_candidates(values), timer()
+                values = strategy(values)
+                stats.record(name, before - count_candidates(values), timer() - start)
+        candidates_after = count_candidates(values)
+        stalled = candidates_before == candidates_after
+        if len([box for box in values.keys() if len(values[box]) == 0]):
+            return False
+    return values
 
 
-def search(values):
+def search(values, strategies=None, stats=None, depth=0):
     """Apply depth first search to solve Sudoku puzzles in order to solve puzzles
     that cannot be solved by repeated reduction alone.
 
@@ -128,6 +185,13 @@ def search(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    strategies(list)
+        the names of the strategies used by reduce_puzzle
+
+    stats(strategies.SolverStats)
+        if given, the branches, backtracks and maximum depth of the search are
+        added to it (as well as the reduce_puzzle counters)
+
     Returns
     -------
     dict or False
@@ -138,11 +202,32 @@ def search(values):
     You should be able to complete this function by copying your code from the classroom
     and extending it to call the naked twins strategy.
     """
-    # TODO: Copy your code from the classroom to complete this function
-    raise NotImplementedError
-
-
-def solve(grid):
+    values = reduce_puzzle(values, strategies, stats)
+    if values is False:
+        return False
+    if all(len(values[s]) == 1 for s in boxes):
+        return values
+    # Choose one of the unfilled squares with the fewest possibilities
+    n, s = min((len(values[s]), s) for s in boxes if len(values[s]) > 1)
+    mark = history.mark()
+    for value in values[s]:
+        history.rewind(mark)
+        new_sudoku = values.copy()
+        assign_value(new_sudoku, s, value)
+        if stats is not None:
+            stats.branch(depth + 1)
+        attempt = search(new_sudoku, strategies, stats, depth + 1)
+        if attempt:
+            return attempt
+        if stats is not None:
+            stats.backtracks += 1
+    return False
+
+
+BACKENDS = ('search', 'bitboard', 'trail', 'dlx')
+
+
+def solve(grid, backend='search', cache=True, stats=None):
     """Find the solution to a Sudoku puzzle using search and constraint propagation
 
     Parameters
@@ -152,19 +237,60 @@ def solve(grid):
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
 
+    backend(string)
+        'search' (default) uses the depth first search in this module,
+        'bitboard' uses the bitmask search in bitboard.py, 'trail' uses the
+        in-place bitmask search with an undo trail, and 'dlx' uses the
+        exact cover solver in dlx.py (see dlx.enumerate_solutions to find all
+        solutions). Every backend uses the units in `unitlist`.
+
+    cache(bool)
+        Look the puzzle up in `solution_cache`, which stores solutions by the
+        canonical form of each puzzle (see symmetry.py), so that relabeled or
+        permuted copies of a solved puzzle are not searched again. The cache is
+        skipped while the assignment history is being recorded, and for grids
+        that are not the size of `boxes` (the symmetries are those of a 9x9
+        board).
+
+    stats(strategies.SolverStats)
+        if given, the 'search', 'bitboard' and 'trail' backends add their
+        search counters and strategy timings to it; the cache is skipped so
+        that every puzzle is actually searched
+
     Returns
     -------
     dict or False
         The dictionary representation of the final sudoku grid or False if no solution exists.
     """
-    values = grid2values(grid)
-    values = search(values)
-    return values
+    if backend not in BACKENDS:
+        raise ValueError("unknown backend {!r}".format(backend))
+    if cache and stats is None and not history.enabled and len(grid) == len(boxes):
+        return solution_cache.solve(grid, backend)
+    return _solve(grid, backend, stats)
+
+
+def _solve(grid, backend, stats=None):
+    if backend == 'search':
+        values = grid2values(grid)
+        values = search(values, stats=stats)
+        return values
+    elif backend == 'bitboard':
+        import bitboard
+        return bitboard.solve(grid, stats=stats)
+    elif backend == 'trail':
+        import bitboard
+        return bitboard.solve(grid, trail=True, stats=stats)
+    import dlx
+    return dlx.solve(grid)
+
+
+solution_cache = SolutionCache(_solve)
 
 
 if __name__ == "__main__":
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
     display(grid2values(diag_sudoku_grid))
+    history.enabled = True
     result = solve(diag_sudoku_grid)
     display(result)
 
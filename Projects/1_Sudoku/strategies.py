@@ -0,0 +1,193 @@
+"""A registry of constraint strategies for reduce_puzzle
+
+Each strategy takes a values dictionary ({'box_name': '123456789', ...}) and
+returns it with some candidates removed. Strategies are registered by name,
+and solution.reduce_puzzle applies the strategies named in `strategies` (or
+solution.STRATEGIES) in order until they stop making progress, so they can be
+enabled, disabled and reordered per run:
+
+    >>> solution.search(values, strategies=['eliminate', 'hidden_singles', 'x_wing'])
+
+Registered strategies
+---------------------
+eliminate : remove the digit of every solved box from its peers
+hidden_singles : a digit with one place left in a unit goes there (only_choice)
+naked_twins : two boxes of a unit with the same two digits remove them from
+    their common peers
+hidden_pairs : two digits that fit only the same two boxes of a unit clear
+    the other candidates from those boxes
+pointing_pairs : when a digit's places in one unit all lie in its intersection
+    with a second unit, the digit is removed from the rest of the second unit
+    (pointing pairs/triples for squares and lines, claiming for lines and
+    squares, and the same for the diagonals)
+x_wing : when a digit fits exactly the same two columns in two rows, it is
+    removed from the rest of those columns (and likewise with rows and
+    columns swapped)
+"""
+from collections import OrderedDict, defaultdict
+from itertools import combinations
+
+import solution
+
+from utils import assign_value, cols
+
+
+registry = OrderedDict()
+
+
+def register(name):
+    """ Decorator that adds a strategy to the registry under `name` """
+    def decorator(fn):
+        registry[name] = fn
+        return fn
+    return decorator
+
+
+def lookup(names):
+    """Return the (name, function) pairs for a list of strategy names
+
+    Raises
+    ------
+    ValueError
+        If a name is not in the registry
+    """
+    missing = [name for name in names if name not in registry]
+    if missing:
+        raise ValueError("unknown strategies {}; choose from {}".format(missing, list(registry)))
+    return [(name, registry[name]) for name in names]
+
+
+class SolverStats:
+    """Counters collected by reduce_puzzle and search when a stats object is
+    passed in (nothing is counted otherwise)
+
+    The same object can be passed to several solves to total them, or a new
+    one can be used per puzzle.
+
+    Attributes
+    ----------
+    passes : int
+        The number of reduce_puzzle passes (solution.py) or propagate calls
+        (bitboard.py)
+
+    branches : int
+        The number of values tried at branch points of the search
+
+    backtracks : int
+        The number of branches that failed
+
+    max_depth : int
+        The deepest level of branching reached
+
+    calls : dict
+        The number of times each strategy ran
+
+    removed : dict
+        The number of candidates each strategy removed
+
+    seconds : dict
+        The total time spent in each strategy
+    """
+    def __init__(self):
+        self.passes = self.branches = self.backtracks = self.max_depth = 0
+        self.calls = defaultdict(int)
+        self.removed = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def record(self, name, removed, seconds):
+        self.calls[name] += 1
+        self.removed[name] += removed
+        self.seconds[name] += seconds
+
+    def branch(self, depth):
+        self.branches += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def report(self):
+        lines = ["Passes: {}  Branches: {}  Backtracks: {}  Max depth: {}".format(
+                     self.passes, self.branches, self.backtracks, self.max_depth),
+                 "{:<16}  {:>7}  {:>8}  {:>10}".format('Strategy', 'Calls', 'Removed', 'ms')]
+        for name in self.calls:
+            lines.append("{:<16}  {:>7}  {:>8}  {:>10.3f}".format(
+                name, self.calls[name], self.removed[name], 1000 * self.seconds[name]))
+        return "\n".join(lines)
+
+
+register('eliminate')(solution.eliminate)
+register('hidden_singles')(solution.only_choice)
+register('naked_twins')(solution.naked_twins)
+
+
+@register('hidden_pairs')
+def hidden_pairs(values):
+    """Keep only the pair in two boxes that are the only places in a unit for
+    two digits
+    """
+    for unit in solution.unitlist:
+        places = {}
+        for digit in cols:
+            dplaces = tuple(box for box in unit if digit in values[box])
+            if len(dplaces) == 2:
+                places.setdefault(dplaces, []).append(digit)
+        for pair, digits in places.items():
+            if len(digits) == 2:
+                for box in pair:
+                    if len(values[box]) > 2:
+                        assign_value(values, box, ''.join(digits))
+    return values
+
+
+def _intersections(unitlist):
+    """ Return (unit index, other unit, boxes of other not in unit) for units sharing 2+ boxes """
+    pairs = []
+    for (i, a), (j, b) in combinations(enumerate(unitlist), 2):
+        if len(set(a) & set(b)) > 1:
+            pairs.append((i, set(b), [box for box in b if box not in a]))
+            pairs.append((j, set(a), [box for box in a if box not in b]))
+    return pairs
+
+
+_unit_intersections = _intersections(solution.unitlist)
+
+
+@register('pointing_pairs')
+def pointing_pairs(values):
+    """Remove a digit from a unit when another unit can only place it in their
+    intersection
+    """
+    places = [{digit: [box for box in unit if digit in values[box]] for digit in cols}
+              for unit in solution.unitlist]
+    for i, other, rest in _unit_intersections:
+        for digit, dplaces in places[i].items():
+            if len(dplaces) > 1 and other.issuperset(dplaces):
+                for box in rest:
+                    if digit in values[box]:
+                        assign_value(values, box, values[box].replace(digit, ''))
+    return values
+
+
+def _x_wing(values, lines, crosses):
+    for digit in cols:
+        spots = defaultdict(list)
+        for line in lines:
+            dplaces = tuple(idx for idx, box in enumerate(line) if digit in values[box])
+            if len(dplaces) == 2:
+                spots[dplaces].append(line)
+        for (i, j), wing in spots.items():
+            if len(wing) != 2:
+                continue
+            keep = {wing[0][i], wing[0][j], wing[1][i], wing[1][j]}
+            for box in crosses[i] + crosses[j]:
+                if box not in keep and digit in values[box]:
+                    assign_value(values, box, values[box].replace(digit, ''))
+
+
+@register('x_wing')
+def x_wing(values):
+    """Remove a digit from two columns when two rows can only place it in
+    those columns (and the same for rows and columns swapped)
+    """
+    _x_wing(values, solution.row_units, solution.column_units)
+    _x_wing(values, solution.column_units, solution.row_units)
+    return values
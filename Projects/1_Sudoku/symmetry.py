@@ -0,0 +1,145 @@
+"""Symmetry-canonical forms and a solution cache for diagonal Sudoku puzzles
+
+Relabeling the digits of a puzzle, or permuting its rows and columns in a way
+that maps every unit onto a unit, gives an equivalent puzzle whose solution is
+the same transform of the original solution. canonical_form picks one
+representative of each equivalence class, so a cache keyed by canonical form
+only has to search each class once.
+
+Because solution.unitlist includes the two diagonal units, only some of the
+band/stack and in-band permutations are symmetries: the row permutation must
+commute with reversing the board (so the diagonals stay diagonals), and the
+columns must follow the rows either directly or mirrored. Together with the
+transpose this gives 96 geometric transforms, times the digit relabelings.
+"""
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from itertools import permutations, product
+from operator import itemgetter
+
+from utils import boxes, cols, grid2values, order, values2grid
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _row_permutations(order):
+    """Return the band-preserving row permutations that commute with reversal
+
+    p[r] is the row of the original board that becomes row r.
+    """
+    n = order * order
+    perms = []
+    for bands in permutations(range(order)):
+        for inner in product(permutations(range(order)), repeat=order):
+            p = tuple(bands[b] * order + inner[b][i] for b in range(order) for i in range(order))
+            if all(p[n - 1 - r] == n - 1 - p[r] for r in range(n)):
+                perms.append(p)
+    return perms
+
+
+@lru_cache(maxsize=None)
+def transforms(order=order):
+    """Return the geometric symmetries of a diagonal Sudoku board
+
+    Returns
+    -------
+    list
+        Each transform is a tuple `src` of box indices: box k of the
+        transformed board is box src[k] of the original board
+    """
+    n = order * order
+    found = set()
+    for p in _row_permutations(order):
+        for q in (p, tuple(n - 1 - x for x in p)):
+            found.add(tuple(p[r] * n + q[c] for r in range(n) for c in range(n)))
+            found.add(tuple(q[c] * n + p[r] for r in range(n) for c in range(n)))
+    return sorted(found)
+
+
+@lru_cache(maxsize=None)
+def _getters(order=order):
+    return [(src, itemgetter(*src)) for src in transforms(order)]
+
+
+def canonical_form(grid):
+    """Find the canonical form of a puzzle under the symmetries of the board
+
+    Every transform is applied, the digits of the result are relabeled in
+    order of first appearance, and the lexicographically smallest string wins.
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    Returns
+    -------
+    (str, tuple, str)
+        The canonical grid, the transform that produced it (see `transforms`),
+        and the original digit of each canonical label ('1', '2', ...)
+    """
+    best = None
+    for src, getter in _getters():
+        cells = ''.join(getter(grid))
+        labels = ''.join(dict.fromkeys(cells.replace('.', '')))
+        key = cells.translate(str.maketrans(labels, cols[:len(labels)]))
+        if best is None or key < best[0]:
+            best = (key, src, labels)
+    key, src, labels = best
+    return key, src, labels + ''.join(d for d in cols if d not in labels)
+
+
+def restore(grid, src, labels):
+    """ Map a grid in canonical form back through the transform from canonical_form """
+    boxes = [None] * len(grid)
+    relabel = str.maketrans(cols, labels)
+    for k, value in enumerate(grid.translate(relabel)):
+        boxes[src[k]] = value
+    return ''.join(boxes)
+
+
+class SolutionCache:
+    """A bounded LRU cache of solutions keyed by the canonical form of each puzzle
+
+    A relabeled, permuted or transposed copy of a cached puzzle costs one call
+    to canonical_form instead of a search.
+
+    Parameters
+    ----------
+    solver : callable
+        Called as solver(grid, *args) with a canonical grid on a cache miss;
+        returns a values dictionary or False
+
+    maxsize : int
+        The number of canonical puzzles kept (least recently used first out)
+    """
+    def __init__(self, solver, maxsize=4096):
+        self.solver = solver
+        self.maxsize = maxsize
+        self.clear()
+
+    def clear(self):
+        self._solutions = OrderedDict()
+        self.hits = self.misses = 0
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._solutions))
+
+    def solve(self, grid, *args):
+        """ Return the solution of a puzzle as a values dictionary, or False """
+        if len(grid) != len(boxes):
+            return self.solver(grid, *args)
+        key, src, labels = canonical_form(grid)
+        if key in self._solutions:
+            self.hits += 1
+            self._solutions.move_to_end(key)
+            solved = self._solutions[key]
+        else:
+            self.misses += 1
+            values = self.solver(key, *args)
+            solved = values2grid(values) if values else False
+            self._solutions[key] = solved
+            if len(self._solutions) > self.maxsize:
+                self._solutions.popitem(last=False)
+        return grid2values(restore(solved, src, labels)) if solved else False
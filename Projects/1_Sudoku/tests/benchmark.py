@@ -0,0 +1,204 @@
+"""Benchmark suite for the Sudoku solver strategies
+
+Times eliminate, only_choice, naked_twins, reduce_puzzle and search separately
+for each engine over the bundled puzzle sets in tests/puzzles, and writes the
+results as JSON. A previous results file can be given as a baseline to report
+the speedup (or slowdown) of every measurement.
+
+    $ python -m tests.benchmark -o results.json
+    $ python -m tests.benchmark --baseline results.json --max-slowdown 1.2
+
+Puzzle sets
+-----------
+easy : solved by constraint propagation alone
+hard : require search (propagation alone leaves every one of them unsolved)
+minimal17 : standard puzzles with the minimum of 17 clues
+diagonal : diagonal Sudoku puzzles (the only set the dict engine in solution.py
+    can run, because solution.unitlist includes the diagonal units)
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+
+from timeit import default_timer as timer
+
+import bitboard
+import dlx
+import solution
+
+from utils import board_tables, grid2values
+
+
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'puzzles')
+
+# puzzle set name -> whether the puzzles use the diagonal units
+PUZZLE_SETS = [('easy', False), ('hard', False), ('minimal17', False), ('diagonal', True)]
+
+ENGINES = ['dict', 'bitboard', 'dlx']
+
+
+def load_puzzles(name):
+    """ Read the grids from tests/puzzles/<name>.txt (one grid per line) """
+    with open(os.path.join(PUZZLE_DIR, name + '.txt')) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def dict_strategies():
+    """ (name, prepare, function) for the dict-based strategies in solution.py """
+    def eliminated(grid):
+        return solution.eliminate(grid2values(grid))
+
+    return [
+        ('eliminate', grid2values, solution.eliminate),
+        ('only_choice', eliminated, solution.only_choice),
+        ('naked_twins', lambda g: solution.only_choice(eliminated(g)), solution.naked_twins),
+        ('reduce_puzzle', grid2values, solution.reduce_puzzle),
+        ('search', grid2values, solution.search),
+    ]
+
+
+def bitboard_strategies(tables):
+    """ (name, prepare, function) for the strategies in bitboard.py """
+    def initial(grid):
+        return bitboard.grid2bits(grid, tables)
+
+    def eliminated(grid):
+        return bitboard.eliminate(initial(grid), tables)
+
+    return [
+        ('eliminate', initial, lambda b: bitboard.eliminate(b, tables)),
+        ('only_choice', eliminated, lambda b: bitboard.only_choice(b, tables)),
+        ('naked_twins', lambda g: bitboard.only_choice(eliminated(g), tables),
+         lambda b: bitboard.naked_twins(b, tables)),
+        ('reduce_puzzle', initial, lambda b: bitboard.reduce_puzzle(b, tables)),
+        ('search', initial, lambda b: bitboard.search(b, tables)),
+        ('search_trail', initial, lambda b: bitboard.search_trail(b, tables)),
+    ]
+
+
+def dlx_strategies(tables):
+    return [('search', lambda g: bitboard.grid2bits(g, tables),
+             lambda b: next(dlx.search_all(b, tables), None))]
+
+
+def time_strategy(fn, states, repeat):
+    """Return the best total time (in seconds) of `repeat` runs of fn over
+    fresh copies of every state; copying happens outside the timed region and
+    garbage collection is paused while timing (as timeit does)
+    """
+    best = float('inf')
+    gc_was_enabled = gc.isenabled()
+    for _ in range(repeat):
+        inputs = [state.copy() for state in states]
+        gc.disable()
+        try:
+            start = timer()
+            for state in inputs:
+                fn(state)
+            best = min(best, timer() - start)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return best
+
+
+def run(sets=None, engines=None, repeat=3):
+    """Run the benchmarks and return a list of result records
+
+    Parameters
+    ----------
+    sets : list
+        The names of the puzzle sets to run (default: all of them)
+
+    engines : list
+        The engines to run, from ENGINES (default: all of them)
+
+    repeat : int
+        The number of timed runs of each measurement (the best is kept)
+    """
+    results = []
+    for name, diagonal in PUZZLE_SETS:
+        if sets and name not in sets:
+            continue
+        grids = load_puzzles(name)
+        tables = board_tables(3, diagonal=diagonal)
+        for engine in engines or ENGINES:
+            if engine == 'dict':
+                if not diagonal:
+                    continue
+                strategies = dict_strategies()
+            elif engine == 'bitboard':
+                strategies = bitboard_strategies(tables)
+            elif engine == 'dlx':
+                strategies = dlx_strategies(tables)
+            else:
+                raise ValueError("unknown engine {!r}".format(engine))
+            for strategy, prepare, fn in strategies:
+                seconds = time_strategy(fn, [prepare(g) for g in grids], repeat)
+                results.append({'set': name, 'engine': engine, 'strategy': strategy,
+                                'puzzles': len(grids), 'seconds': seconds,
+                                'per_puzzle_us': 1e6 * seconds / len(grids)})
+    return results
+
+
+def compare(results, baseline):
+    """Annotate results with the matching baseline time and the speedup
+    (baseline seconds / current seconds) of each measurement
+    """
+    previous = {(r['set'], r['engine'], r['strategy']): r['seconds'] for r in baseline['results']}
+    for record in results:
+        key = (record['set'], record['engine'], record['strategy'])
+        if key in previous:
+            record['baseline_seconds'] = previous[key]
+            record['speedup'] = previous[key] / record['seconds'] if record['seconds'] else float('inf')
+    return results
+
+
+def report(results):
+    lines = ["{:<10}  {:<9}  {:<14}  {:>12}  {:>8}".format(
+        'Set', 'Engine', 'Strategy', 'us/puzzle', 'Speedup')]
+    for r in results:
+        speedup = "{:.2f}x".format(r['speedup']) if 'speedup' in r else '-'
+        lines.append("{:<10}  {:<9}  {:<14}  {:>12.1f}  {:>8}".format(
+            r['set'], r['engine'], r['strategy'], r['per_puzzle_us'], speedup))
+    return "\n".join(lines)
+
+
+def main(args):
+    results = run(args.sets, args.engines, args.repeat)
+    document = {'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                         'repeat': args.repeat},
+                'results': results}
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    print(report(results))
+
+    slow = [r for r in results if args.max_slowdown and r.get('speedup', 1) * args.max_slowdown < 1]
+    for r in slow:
+        print("REGRESSION: {set} {engine} {strategy} is {0:.2f}x slower than the baseline".format(
+            1 / r['speedup'], **r), file=sys.stderr)
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the Sudoku solver strategies over the " +
+        "bundled puzzle sets and write the results as JSON.")
+    parser.add_argument('-s', '--sets', nargs='+', choices=[name for name, _ in PUZZLE_SETS],
+                        help="The puzzle sets to run (default: all)")
+    parser.add_argument('-e', '--engines', nargs='+', choices=ENGINES,
+                        help="The engines to run (default: all)")
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help="The number of timed runs of each measurement; the best is reported")
+    parser.add_argument('-o', '--output', help="The file to write the JSON results to")
+    parser.add_argument('-b', '--baseline', help="A previous JSON results file to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=None,
+                        help="Exit with status 1 if any measurement is slower than the baseline " +
+                             "by more than this factor")
+    sys.exit(main(parser.parse_args()))
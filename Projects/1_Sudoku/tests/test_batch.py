@@ -0,0 +1,47 @@
+import io
+import unittest
+
+import batch
+
+from tests import test_solution
+from utils import board_tables, values2grid
+
+
+class TestBatch(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+    solved = values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+    hard = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+
+    def test_read_puzzles(self):
+        lines = ["# comment\n", "\n", self.grid.replace('.', '0') + "\n"]
+        self.assertEqual(list(batch.read_puzzles(lines)), [self.grid])
+        with self.assertRaises(ValueError):
+            list(batch.read_puzzles(["123"]))
+
+    def test_order_preserved(self):
+        grids = [self.grid, '22' + '.' * 79] * 3
+        for workers in (1, 2):
+            stats = batch.BatchStats()
+            results = list(batch.solve_stream(grids, workers=workers, chunksize=2, stats=stats,
+                                              diagonal=True))
+            self.assertEqual(results, [self.solved, batch.UNSOLVABLE] * 3)
+            self.assertEqual((stats.count, stats.unsolvable), (6, 3))
+
+    def test_main(self):
+        outfile = io.StringIO()
+        stats = batch.main(io.StringIO(self.grid + "\n"), outfile, workers=1, diagonal=True)
+        self.assertEqual(outfile.getvalue(), self.solved + "\n")
+        p50, p100 = stats.percentiles([50, 100])
+        self.assertLessEqual(p50, p100)
+        self.assertIn("puzzles/sec", stats.report())
+
+    def test_standard_rules(self):
+        (solved, _), = batch.solve_chunk([self.hard])
+        self.assertTrue(all(g in ('.', s) for g, s in zip(self.hard, solved)))
+        for unit in board_tables(3).units:
+            self.assertEqual(len(set(solved[idx] for idx in unit)), 9)
+        self.assertEqual(batch.solve_chunk([self.hard], diagonal=True)[0][0], batch.UNSOLVABLE)
+
+
+if __name__ == '__main__':
+    unittest.main()
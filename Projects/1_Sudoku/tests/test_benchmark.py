@@ -0,0 +1,47 @@
+import unittest
+
+from itertools import islice
+
+import bitboard
+import dlx
+
+from tests import benchmark
+from utils import board_tables
+
+
+class TestPuzzleSets(unittest.TestCase):
+    def test_puzzles_have_unique_solutions(self):
+        for name, diagonal in benchmark.PUZZLE_SETS:
+            tables = board_tables(3, diagonal=diagonal)
+            grids = benchmark.load_puzzles(name)
+            self.assertTrue(grids, name)
+            for grid in grids:
+                self.assertEqual(len(grid), 81)
+                self.assertEqual(len(list(islice(dlx.enumerate_solutions(grid, tables), 2))), 1, grid)
+
+    def test_difficulty(self):
+        tables = board_tables(3)
+        for name, needs_search in [('easy', False), ('hard', True)]:
+            for grid in benchmark.load_puzzles(name):
+                board = bitboard.reduce_puzzle(bitboard.grid2bits(grid, tables), tables)
+                solved = all(mask & (mask - 1) == 0 for mask in board)
+                self.assertEqual(solved, not needs_search, grid)
+
+    def test_minimal_clues(self):
+        for grid in benchmark.load_puzzles('minimal17'):
+            self.assertEqual(sum(c != '.' for c in grid), 17)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_and_compare(self):
+        results = benchmark.run(sets=['easy'], engines=['bitboard'], repeat=1)
+        self.assertEqual([r['strategy'] for r in results],
+                         ['eliminate', 'only_choice', 'naked_twins', 'reduce_puzzle', 'search', 'search_trail'])
+        baseline = {'results': [dict(r, seconds=2 * r['seconds']) for r in results]}
+        for record in benchmark.compare(results, baseline):
+            self.assertAlmostEqual(record['speedup'], 2.0)
+        self.assertIn('2.00x', benchmark.report(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
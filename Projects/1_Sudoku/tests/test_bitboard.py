@@ -0,0 +1,120 @@
+import unittest
+
+import bitboard
+import solution
+
+from tests import test_solution
+from utils import grid2values, board_tables, DIGITS
+
+
+class TestConversions(unittest.TestCase):
+    def test_round_trip(self):
+        values = test_solution.TestNakedTwins.before_naked_twins_1
+        self.assertEqual(bitboard.bits2values(bitboard.values2bits(values)), values)
+
+    def test_grid2bits(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(bitboard.grid2bits(grid), bitboard.values2bits(grid2values(grid)))
+        self.assertEqual(bitboard.bits2grid(bitboard.grid2bits(grid)), grid)
+
+
+class TestBitStrategies(unittest.TestCase):
+    def test_naked_twins(self):
+        twins = test_solution.TestNakedTwins
+        for before, solutions in [(twins.before_naked_twins_1, twins.possible_solutions_1),
+                                  (twins.before_naked_twins_2, twins.possible_solutions_2)]:
+            board = bitboard.values2bits(before)
+            self.assertIn(bitboard.bits2values(bitboard.naked_twins(board)), solutions)
+
+    def test_matches_dict_strategies(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        for bit_fn, dict_fn in [(bitboard.eliminate, solution.eliminate),
+                                (bitboard.only_choice, solution.only_choice)]:
+            values = solution.eliminate(grid2values(grid))
+            board = bitboard.values2bits(values)
+            self.assertEqual(bitboard.bits2values(bit_fn(board)), dict_fn(values))
+
+    def test_solve(self):
+        self.assertEqual(bitboard.solve(test_solution.TestDiagonalSudoku.diagonal_grid),
+                         test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_unsolvable(self):
+        grid = '22' + '.' * 79
+        self.assertFalse(bitboard.solve(grid))
+
+
+class TestPropagate(unittest.TestCase):
+    hard_grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+
+    def test_empty_domain(self):
+        board = bitboard.grid2bits('12' + '.' * 79)
+        board[2] = 0b11
+        self.assertFalse(bitboard.propagate(board))
+
+    def test_digit_without_place(self):
+        board = bitboard.grid2bits('.' * 81)
+        for idx in range(8):
+            board[idx] &= ~1
+        board[8] &= ~1
+        self.assertFalse(bitboard.propagate(board, changed=range(9)))
+
+    def test_solves_standard_hard_puzzle(self):
+        tables = board_tables(3)
+        result = bitboard.bits2grid(bitboard.search(bitboard.grid2bits(self.hard_grid, tables), tables))
+        self.assertTrue(all(g in ('.', r) for g, r in zip(self.hard_grid, result)))
+        for unit in tables.units:
+            self.assertEqual(len(set(result[idx] for idx in unit)), 9)
+
+
+class TestSearchTrail(unittest.TestCase):
+    def test_matches_copying_search(self):
+        tables = board_tables(3)
+        grid = TestPropagate.hard_grid
+        self.assertEqual(bitboard.search_trail(bitboard.grid2bits(grid, tables), tables),
+                         bitboard.search(bitboard.grid2bits(grid, tables), tables))
+
+    def test_undo_restores_board(self):
+        tables = board_tables(3)
+        board = bitboard.reduce_puzzle(bitboard.grid2bits(TestPropagate.hard_grid, tables), tables)
+        before, trail = board[:], []
+        idx = bitboard.select_box(board, tables)
+        trail.append((idx, board[idx]))
+        board[idx] &= -board[idx]
+        bitboard.propagate(board, tables, (idx,), trail)
+        while trail:
+            idx, old = trail.pop()
+            board[idx] = old
+        self.assertEqual(board, before)
+
+    def test_select_box_degree_tiebreak(self):
+        tables = board_tables(3)
+        board = bitboard.grid2bits('.' * 81, tables)
+        board[0] = board[80] = 0b11
+        for peer in tables.peers[80][:5]:
+            board[peer] = 0b1000
+        self.assertEqual(bitboard.select_box(board, tables), 0)
+
+
+class TestBoardTables(unittest.TestCase):
+    def test_default_tables_match_unitlist(self):
+        tables = board_tables(3, diagonal=True)
+        self.assertEqual(tables.units, bitboard.DEFAULT_TABLES.units)
+        self.assertEqual(tables.peers, bitboard.DEFAULT_TABLES.peers)
+        self.assertTrue(all(len(p) == 20 for p in board_tables(3).peers))
+
+    def test_tables_cached(self):
+        self.assertIs(board_tables(4), board_tables(4))
+
+    def test_solve_16x16(self):
+        order, size = 4, 16
+        solved = ''.join(DIGITS[(order * (r % order) + r // order + c) % size]
+                         for r in range(size) for c in range(size))
+        grid = ''.join('.' if (idx * 7) % 5 < 3 else d for idx, d in enumerate(solved))
+        result = bitboard.bits2grid(bitboard.search(bitboard.grid2bits(grid)))
+        self.assertTrue(all(g in ('.', r) for g, r in zip(grid, result)))
+        for unit in board_tables(order).units:
+            self.assertEqual(len(set(result[idx] for idx in unit)), size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import bitboard
+import counting
+import dlx
+
+from tests import test_solution
+from utils import board_tables, values2grid
+
+
+class TestCounting(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+    solved = values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+    hard = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+
+    def test_unique_and_unsolvable(self):
+        self.assertEqual(counting.count_solutions(self.grid, diagonal=True), 1)
+        self.assertEqual(counting.count_solutions('22' + '.' * 79), 0)
+        self.assertEqual(counting.count_solutions(self.solved), 1)
+
+    def test_standard_rules(self):
+        self.assertEqual(counting.count_solutions(self.hard), 1)
+        self.assertEqual(counting.count_solutions(self.hard, diagonal=True), 0)
+
+    def test_invalid_limit(self):
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                counting.count_solutions(self.grid, limit)
+
+    def test_limit_and_full_count(self):
+        tables = board_tables(3)
+        grid = '.' * 30 + self.solved[30:]
+        total = len(list(dlx.enumerate_solutions(grid, tables)))
+        self.assertEqual(counting.count_solutions(grid, None, tables), total)
+        for limit in (1, 2, 5):
+            self.assertEqual(counting.count_solutions(grid, limit, tables), limit)
+
+    def test_split(self):
+        tables = board_tables(3)
+        board = bitboard.grid2bits('.' * 30 + self.solved[30:], tables)
+        bitboard.reduce_puzzle(board, tables)
+        solved, parts = counting.split(board, tables, 8)
+        self.assertGreaterEqual(len(parts), 8)
+        self.assertEqual(solved + sum(counting.count(part, tables, None) for part in parts),
+                         counting.count(board, tables, None))
+
+    def test_parallel(self):
+        tables = board_tables(3)
+        grid = '.' * 30 + self.solved[30:]
+        self.assertEqual(counting.count_solutions(grid, None, tables, workers=2),
+                         counting.count_solutions(grid, None, tables))
+        self.assertEqual(counting.count_solutions('1' + '.' * 255, limit=2, workers=2, parts=4), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+import dlx
+import solution
+
+from tests import test_solution
+from utils import board_tables, values2grid
+
+
+class TestDLX(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+    solved = test_solution.TestDiagonalSudoku.solved_diag_sudoku
+
+    def test_solve_backends(self):
+        for backend in ('search', 'bitboard', 'trail', 'dlx'):
+            self.assertEqual(solution.solve(self.grid, backend=backend, cache=False), self.solved)
+        with self.assertRaises(ValueError):
+            solution.solve(self.grid, backend='nope')
+
+    def test_unsolvable(self):
+        self.assertFalse(dlx.solve('22' + '.' * 79))
+
+    def test_enumerate_solutions(self):
+        self.assertEqual(list(dlx.enumerate_solutions(self.grid)), [values2grid(self.solved)])
+
+        tables = board_tables(3)
+        full = values2grid(self.solved)
+        grid = '.' * 30 + full[30:]
+        found = list(dlx.enumerate_solutions(grid, tables))
+        self.assertGreater(len(found), 1)
+        self.assertEqual(len(set(found)), len(found))
+        for result in found:
+            self.assertTrue(all(g in ('.', r) for g, r in zip(grid, result)))
+            for unit in tables.units:
+                self.assertEqual(len(set(result[idx] for idx in unit)), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import random
+import unittest
+
+import bitboard
+import generator
+import solution
+
+from utils import cols, values2grid
+
+
+class TestGenerator(unittest.TestCase):
+    def test_random_solution(self):
+        grid = generator.random_solution(random.Random(0))
+        for unit in solution.unitlist:
+            self.assertEqual(sorted(grid[solution.boxes.index(box)] for box in unit), list('123456789'))
+
+    def test_random_fill_differs_per_seed(self):
+        tables = bitboard.DEFAULT_TABLES
+        grid = ''.join(cols[idx // 10] if idx % 10 == 0 else '.' for idx in range(81))  # digits on the diagonal
+        board = bitboard.reduce_puzzle(bitboard.grid2bits(grid, tables), tables)
+        solved = {bitboard.bits2grid(generator._random_fill(board, tables, random.Random(seed), [10000]))
+                  for seed in range(10)}
+        self.assertGreater(len(solved), 5)
+
+    def test_random_solution_gives_up(self):
+        with self.assertRaises(RuntimeError):
+            generator.random_solution(random.Random(0), max_attempts=3, max_nodes=1)
+
+    def test_generate(self):
+        rng = random.Random(0)
+        for difficulty in ('easy', 'hard'):
+            grid = generator.generate(30, difficulty, rng)
+            self.assertEqual(81 - grid.count('.'), 30)
+            self.assertTrue(generator.has_unique_solution(grid))
+            self.assertEqual(generator.grade(grid), difficulty)
+            solved = values2grid(solution.solve(grid, backend='bitboard', cache=False))
+            self.assertTrue(all(g in ('.', s) for g, s in zip(grid, solved)))
+        with self.assertRaises(ValueError):
+            generator.generate(30, 'fiendish')
+
+    def test_stream_is_reproducible(self):
+        serial = list(generator.generate_stream(5, 34, workers=1, chunksize=2, seed=7))
+        parallel = list(generator.generate_stream(5, 34, workers=2, chunksize=2, seed=7))
+        self.assertEqual(len(serial), 5)
+        self.assertEqual(serial, parallel)
+        self.assertNotEqual(serial, list(generator.generate_stream(5, 34, workers=1, chunksize=2, seed=8)))
+
+
+if __name__ == '__main__':
+    unittest.main()
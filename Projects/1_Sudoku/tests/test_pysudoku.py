@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+import solution
+
+from tests import test_solution
+from utils import grid2values, history
+
+try:
+    import pygame
+    import PySudoku
+except ImportError:
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, "the replay renderer requires pygame")
+class TestPySudoku(unittest.TestCase):
+    def test_headless_replay(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        history.clear()
+        history.enabled = True
+        try:
+            result = solution.solve(grid)
+        finally:
+            history.enabled = False
+        changes = len(history.path())
+        with tempfile.TemporaryDirectory() as tmp:
+            count = PySudoku.play(grid2values(grid), result, history,
+                                  frames=os.path.join(tmp, 'frame%03d.bmp'))
+            self.assertEqual(count, changes + 1)
+            self.assertEqual(sorted(os.listdir(tmp)), ['frame%03d.bmp' % i for i in range(count)])
+        history.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import server
+
+from tests import benchmark, test_solution
+from utils import board_tables, values2grid
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+    solved = values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+
+    async def asyncSetUp(self):
+        self.server = server.SudokuServer(workers=1, batch_size=4, max_inflight=3, diagonal=True)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def exchange(self, reader, writer, lines):
+        writer.write("".join(line + "\n" for line in lines).encode())
+        await writer.drain()
+        writer.write_eof()
+        replies = [line.decode().strip().split(' ', 1) async for line in reader]
+        writer.close()
+        replies.sort(key=lambda reply: int(reply[0]))
+        self.assertEqual([int(lineno) for lineno, _ in replies], list(range(1, len(lines) + 1)))
+        return [result for _, result in replies]
+
+    async def test_tcp(self):
+        srv = await self.server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        lines = [self.grid, '22' + '.' * 79, 'nonsense', self.grid.replace('.', '0')] * 3
+        results = await self.exchange(*await asyncio.open_connection('127.0.0.1', port), lines)
+        self.assertEqual(results, [self.solved, server.UNSOLVABLE,
+                                   "error: expected an 81-character grid", self.solved] * 3)
+        self.assertEqual(self.server.solved, 9)
+        self.assertGreaterEqual(self.server.batches, 3)
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), "requires Unix sockets")
+    async def test_unix_concurrent_clients(self):
+        grids = benchmark.load_puzzles('diagonal')
+        expected = [values2grid(server.solution.solve(g, 'dlx', cache=False)) for g in grids]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sudoku.sock')
+            await self.server.start(path=path)
+            clients = [self.exchange(*await asyncio.open_unix_connection(path), grids[i::2])
+                       for i in range(2)]
+            results = await asyncio.gather(*clients)
+        self.assertEqual(results, [expected[0::2], expected[1::2]])
+
+    async def test_slow_puzzle_does_not_stall_later_replies(self):
+        release = threading.Event()
+        solve_batch = server.solve_batch
+
+        def blocking_solve_batch(grids, backend, diagonal):
+            if self.grid in grids:
+                release.wait(10)
+            return solve_batch(grids, backend, diagonal)
+
+        self.server = server.SudokuServer(workers=2, batch_size=1, diagonal=True)
+        srv = await self.server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        self.server.pool.shutdown()
+        self.server.pool = ThreadPoolExecutor(2)
+        with mock.patch.object(server, 'solve_batch', blocking_solve_batch):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write("".join(line + "\n" for line in
+                                 [self.grid, self.solved, '22' + '.' * 79]).encode())
+            await writer.drain()
+            fast = {(await reader.readline()).decode().strip() for _ in range(2)}
+            self.assertEqual(fast, {"2 " + self.solved, "3 " + server.UNSOLVABLE})
+            release.set()
+            self.assertEqual((await reader.readline()).decode().strip(), "1 " + self.solved)
+            writer.close()
+
+
+
+class TestSolveBatch(unittest.TestCase):
+    hard = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+
+    def test_standard_rules(self):
+        solved, = server.solve_batch([self.hard], 'bitboard')
+        self.assertTrue(all(g in ('.', s) for g, s in zip(self.hard, solved)))
+        for unit in board_tables(3).units:
+            self.assertEqual(len(set(solved[idx] for idx in unit)), 9)
+        self.assertEqual(server.solve_batch([self.hard], 'dlx'), [solved])
+        self.assertEqual(server.solve_batch([self.hard], 'trail', diagonal=True), [server.UNSOLVABLE])
+        with self.assertRaises(ValueError):
+            server.SudokuServer(backend='search')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import bitboard
+import solution
+import strategies
+
+from tests import benchmark, test_solution
+from utils import board_tables, grid2values
+
+
+class TestStrategies(unittest.TestCase):
+    def blank(self, digits):
+        return {box: digits for box in solution.boxes}
+
+    def test_hidden_pairs(self):
+        values = self.blank('3456789')
+        values.update({'A1': '1234', 'A2': '1256'})
+        values = strategies.hidden_pairs(values)
+        self.assertEqual((values['A1'], values['A2'], values['A3']), ('12', '12', '3456789'))
+
+    def test_pointing_pairs(self):
+        values = self.blank('23456789')
+        values.update({'A1': '12', 'A2': '12', 'A7': '17'})
+        values = strategies.pointing_pairs(values)
+        self.assertEqual((values['A1'], values['A7']), ('12', '7'))
+
+    def test_x_wing(self):
+        values = self.blank('23456789')
+        for box in ('A1', 'A5', 'E1', 'E5', 'C1', 'G5'):
+            values[box] = '1' + values[box]
+        values = strategies.x_wing(values)
+        self.assertEqual([values[box][0] for box in ('A1', 'A5', 'E1', 'E5')], ['1'] * 4)
+        self.assertNotIn('1', values['C1'] + values['G5'])
+
+    def test_registry(self):
+        self.assertEqual(list(strategies.registry)[:3], solution.STRATEGIES)
+        with self.assertRaises(ValueError):
+            strategies.lookup(['eliminate', 'swordfish'])
+
+    def test_search_with_all_strategies(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        stats = strategies.SolverStats()
+        names = list(strategies.registry)[::-1]
+        result = solution.search(grid2values(grid), names, stats)
+        self.assertEqual(result, test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertEqual(list(stats.calls), names)
+        self.assertGreater(stats.removed['eliminate'], 0)
+        self.assertIn('x_wing', stats.report())
+
+
+class TestSolverStats(unittest.TestCase):
+    def check_counters(self, stats):
+        self.assertGreater(stats.branches, 0)
+        self.assertLessEqual(stats.backtracks, stats.branches)
+        self.assertGreaterEqual(stats.max_depth, stats.branches - stats.backtracks)
+        self.assertGreater(stats.passes, 0)
+        self.assertIn('Max depth', stats.report())
+
+    def test_dict_search(self):
+        grid = benchmark.load_puzzles('diagonal')[1]
+        stats = strategies.SolverStats()
+        before = solution.solution_cache.cache_info()
+        self.assertEqual(solution.solve(grid, stats=stats), solution.solve(grid, 'dlx', cache=False))
+        self.assertEqual(solution.solution_cache.cache_info(), before)
+        self.check_counters(stats)
+        self.assertEqual(list(stats.calls), solution.STRATEGIES)
+
+    def test_bitboard_search(self):
+        tables = board_tables(3)
+        for search in (bitboard.search, bitboard.search_trail):
+            stats = strategies.SolverStats()
+            board = bitboard.grid2bits(benchmark.load_puzzles('hard')[0], tables)
+            self.assertTrue(search(board, tables, stats))
+            self.check_counters(stats)
+            self.assertEqual(stats.passes, stats.branches + 1)
+            self.assertEqual(stats.calls['propagate'], stats.passes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import solution
+import symmetry
+
+from bitboard import board_tables
+from tests import test_solution
+from utils import boxes, values2grid
+
+
+class TestSymmetry(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+    solved = values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def variant(self, grid, src, digits='987654321'):
+        return ''.join(grid[i] for i in src).translate(str.maketrans('123456789', digits))
+
+    def test_transforms_preserve_units(self):
+        units = {frozenset(unit) for unit in solution.unitlist}
+        transforms = symmetry.transforms()
+        self.assertEqual(len(transforms), 96)
+        for src in transforms:
+            moved = {boxes[old]: boxes[new] for new, old in enumerate(src)}
+            for unit in solution.unitlist:
+                self.assertIn(frozenset(moved[box] for box in unit), units)
+
+    def test_canonical_form_is_invariant(self):
+        key = symmetry.canonical_form(self.grid)[0]
+        for src in symmetry.transforms()[::7]:
+            variant = self.variant(self.grid, src)
+            variant_key, variant_src, labels = symmetry.canonical_form(variant)
+            self.assertEqual(variant_key, key)
+            self.assertEqual(symmetry.restore(variant_key, variant_src, labels), variant)
+
+    def test_cache_maps_solutions_back(self):
+        cache = symmetry.SolutionCache(solution._solve, maxsize=1)
+        self.assertEqual(values2grid(cache.solve(self.grid, 'bitboard')), self.solved)
+        src = symmetry.transforms()[-1]
+        result = cache.solve(self.variant(self.grid, src, '342198765'), 'bitboard')
+        self.assertEqual(values2grid(result), self.variant(self.solved, src, '342198765'))
+        self.assertEqual(cache.cache_info(), symmetry.CacheInfo(1, 1, 1, 1))
+
+        self.assertFalse(cache.solve('22' + '.' * 79, 'bitboard'))
+        self.assertEqual(cache.cache_info(), symmetry.CacheInfo(1, 2, 1, 1))
+
+    def test_cache_skips_larger_boards(self):
+        before = solution.solution_cache.cache_info()
+        result = list(solution.solve('.' * 256, backend='bitboard').values())
+        self.assertEqual(len(result), 256)
+        for unit in board_tables(4).units:
+            self.assertEqual(len(set(result[idx] for idx in unit)), 16)
+        self.assertEqual(solution.solution_cache.cache_info(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
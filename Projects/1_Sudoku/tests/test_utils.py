@@ -0,0 +1,53 @@
+import unittest
+
+import solution
+
+from tests import test_solution
+from utils import history, grid2values, reconstruct, extract_units
+
+
+class TestHistoryLog(unittest.TestCase):
+    grid = test_solution.TestDiagonalSudoku.diagonal_grid
+
+    def setUp(self):
+        history.clear()
+
+    def tearDown(self):
+        history.enabled = False
+        history.clear()
+
+    def test_disabled_by_default(self):
+        solution.solve(self.grid)
+        self.assertEqual(len(history), 0)
+
+    def test_reconstruct(self):
+        history.enabled = True
+        result = solution.solve(self.grid)
+        path = reconstruct(result, history)
+        self.assertTrue(path)
+        values = grid2values(self.grid)
+        for box, value in path:
+            self.assertEqual(result[box], value)
+            values[box] = value
+        self.assertTrue(all(values[box] == result[box] for box in result if len(values[box]) == 1))
+
+    def test_rewind(self):
+        history.enabled = True
+        history.record('A1', '1')
+        mark = history.mark()
+        history.record('A2', '2')
+        history.rewind(mark)
+        history.record('A3', '3')
+        self.assertEqual(history.path(), [('A1', '1'), ('A3', '3')])
+        self.assertEqual(len(history), 3)
+
+
+class TestExtractUnits(unittest.TestCase):
+    def test_units_in_unitlist_order(self):
+        units = extract_units(solution.unitlist, solution.boxes)
+        for box in solution.boxes:
+            self.assertEqual(units[box], [u for u in solution.unitlist if box in u])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import bitboard
+import variants
+
+from tests import benchmark
+from utils import board_tables, values2grid
+
+
+MIRACLE = '483726159726159483159483726837261594261594837594837261372615948615948372948372615'
+
+
+class TestVariants(unittest.TestCase):
+    def test_miracle(self):
+        grid = '.' * 38 + '1' + '.' * 12 + '2' + '.' * 29
+        spec = {'anti_knight': True, 'anti_king': True, 'non_consecutive': True}
+        self.assertEqual(values2grid(variants.solve(grid, spec)), MIRACLE)
+
+    def test_killer(self):
+        cages = []
+        for r, row in enumerate('ABCDEFGHI'):
+            for c in range(0, 9, 3):
+                cages.append([sum(int(MIRACLE[r * 9 + c + k]) for k in range(3)),
+                              [row + str(c + k + 1) for k in range(3)]])
+        result = values2grid(variants.solve('.' * 81, {'cages': cages}))
+        for unit in board_tables(3).units:
+            self.assertEqual(sorted(result[idx] for idx in unit), list('123456789'))
+        names = variants.compile_spec({'cages': cages}).tables.boxes
+        for total, boxes in cages:
+            self.assertEqual(sum(int(result[names.index(box)]) for box in boxes), total)
+
+    def test_regions(self):
+        squares = ''.join(str(r // 3 * 3 + c // 3) for r in range(9) for c in range(9))
+        variant = variants.compile_spec({'regions': squares})
+        self.assertEqual(sorted(variant.tables.units), sorted(board_tables(3).units))
+        grid = benchmark.load_puzzles('hard')[0]
+        expected = bitboard.search(bitboard.grid2bits(grid, board_tables(3)), board_tables(3))
+        self.assertEqual(variants.solve(grid, {'regions': squares}), bitboard.bits2values(expected, variant.tables))
+
+    def test_compile_is_cached(self):
+        a = variants.compile_spec({'diagonal': True, 'anti_knight': True})
+        b = variants.compile_spec({'anti_knight': True, 'diagonal': True})
+        self.assertIs(a, b)
+        self.assertIn(19, a.tables.peers[0])  # C2 is a knight's move from A1
+
+    def test_invalid_specs(self):
+        for spec in ({'sandwich': True}, {'regions': '0' * 81}, {'cages': [[2, ['A1', 'A2']]]},
+                     {'cages': [[3, ['A1', 'Z9']]]}):
+            with self.assertRaises(ValueError):
+                variants.compile_spec(spec)
+
+
+if __name__ == '__main__':
+    unittest.main()
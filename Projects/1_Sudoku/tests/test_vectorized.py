@@ -0,0 +1,44 @@
+import unittest
+
+import bitboard
+
+from tests import benchmark, test_solution
+from utils import board_tables, values2grid
+
+try:
+    import numpy as np
+    import vectorized
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "vectorized propagation requires numpy")
+class TestVectorized(unittest.TestCase):
+    def test_tensor_round_trip(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        cand = vectorized.grids2tensor([grid])
+        self.assertEqual(cand.shape, (1, 81, 9))
+        self.assertEqual(vectorized.tensor2bits(cand), [bitboard.grid2bits(grid)])
+
+    def test_propagate_status(self):
+        tables = board_tables(3)
+        easy, hard = benchmark.load_puzzles('easy')[0], benchmark.load_puzzles('hard')[0]
+        cand, status = vectorized.propagate(vectorized.grids2tensor([easy, hard, '22' + '.' * 79], tables), tables)
+        self.assertEqual(list(status), [vectorized.SOLVED, vectorized.UNSOLVED, vectorized.CONTRADICTION])
+
+    def test_solve_batch_matches_scalar(self):
+        for name, diagonal in benchmark.PUZZLE_SETS:
+            tables = board_tables(3, diagonal=diagonal)
+            grids = benchmark.load_puzzles(name)[:5]
+            expected = [bitboard.bits2grid(bitboard.search(bitboard.grid2bits(g, tables), tables), tables)
+                        for g in grids]
+            self.assertEqual(vectorized.solve_batch(grids, tables), expected)
+
+    def test_default_tables_are_diagonal(self):
+        grid = test_solution.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(vectorized.solve_batch([grid]),
+                         [values2grid(test_solution.TestDiagonalSudoku.solved_diag_sudoku)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,73 @@
 
-from collections import defaultdict
+from array import array
+from collections import defaultdict, namedtuple
+from functools import lru_cache
 
 
 rows = 'ABCDEFGHI'
 cols = '123456789'
 boxes = [r + c for r in rows for c in cols]
-history = {}  # history must be declared here so that it exists in the assign_values scope
+order = 3  # the side length of each square unit; the board has order**2 rows and columns
+
+
+class HistoryLog:
+    """An append-only log of the single-value assignments made while solving
+
+    Each entry stores a box index, the assigned digit, and a pointer to its
+    parent entry in compact arrays, so recording an assignment is O(1) and
+    never builds grid strings. Search branches share the entries above the
+    point where they split: call `mark()` before trying a branch and
+    `rewind(mark)` before trying the next one, and the chain of parents from
+    `head` is always the path to the board currently being solved.
+
+    Recording is opt-in (see `enabled`) so that it costs nothing when the
+    visualization is not used.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether assign_value records assignments in this log
+
+    head : int
+        The index of the most recent entry on the current path (-1 if empty)
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.clear()
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def clear(self):
+        self.boxes = array('H')
+        self.digits = array('B')
+        self.parents = array('l')
+        self.head = -1
+
+    def record(self, box, value):
+        self.boxes.append(_box_index[box])
+        self.digits.append(ord(value))
+        self.parents.append(self.head)
+        self.head = len(self.parents) - 1
+
+    def mark(self):
+        return self.head
+
+    def rewind(self, mark):
+        self.head = mark
+
+    def path(self, head=None):
+        """ Return the (box, value) assignments from the root to head, in order """
+        steps = []
+        idx = self.head if head is None else head
+        while idx >= 0:
+            steps.append((boxes[self.boxes[idx]], chr(self.digits[idx])))
+            idx = self.parents[idx]
+        return steps[::-1]
+
+
+_box_index = {box: idx for idx, box in enumerate(boxes)}
+history = HistoryLog()  # history must be declared here so that it exists in the assign_values scope
 
 
 def extract_units(unitlist, boxes):
@@ -27,11 +89,12 @@ def extract_units(unitlist, boxes):
     """
     # the value for keys that aren't in the dictionary are initialized as an empty list
     units = defaultdict(list)
-    for current_box in boxes:
-        for unit in unitlist:
-            if current_box in unit:
-                # defaultdict avoids this raising a KeyError when new keys are added
-                units[current_box].append(unit)
+    # a single pass over the unitlist appends each unit to its member boxes in
+    # unitlist order, which avoids testing every box against every unit
+    for unit in unitlist:
+        for current_box in unit:
+            # defaultdict avoids this raising a KeyError when new keys are added
+            units[current_box].append(unit)
     return units
 
 
@@ -66,10 +129,142 @@ def extract_peers(units, boxes):
     return peers
 
 
+BoardTables = namedtuple('BoardTables', ['order', 'size', 'digits', 'boxes', 'units', 'box_units', 'peers', 'peer_masks'])
+BoardTables.__doc__ = """Integer index tables describing the units and peers of a board
+
+Boxes are identified by their index in row-major order, so a board of any
+order can be stored as a flat list (see bitboard.py).
+
+Attributes
+----------
+order : int
+    The side length of each square unit (3 for a 9x9 board)
+
+size : int
+    The number of rows, columns and digits (order**2)
+
+digits : str
+    The symbol for each digit, in bit order
+
+boxes : tuple
+    The name of each box (e.g., "A1"), in index order
+
+units : tuple
+    A tuple of units, each a tuple of box indices
+
+box_units : tuple
+    For each box, a tuple of the indices (into units) of the units that the
+    box belongs to
+
+peers : tuple
+    For each box, a sorted tuple of the indices of its peers
+
+peer_masks : tuple
+    For each box, an int with bit i set for every peer box i
+"""
+
+DIGITS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+ROWS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def index_tables(units, box_names, digits, order=None, links=()):
+    """Build BoardTables from units given as sequences of box indices
+
+    Parameters
+    ----------
+    units(list)
+        a list of units, each an iterable of box indices
+
+    box_names(list)
+        the name of each box, in index order
+
+    digits(str)
+        the symbol for each digit, in bit order
+
+    links(iterable)
+        extra (i, j) pairs of boxes that must hold different digits without
+        sharing a unit (e.g., the boxes of a killer cage or a knight's move
+        apart); they are added to the peers of both boxes
+
+    Returns
+    -------
+    BoardTables
+    """
+    units = tuple(tuple(unit) for unit in units)
+    box_units = [[] for _ in box_names]
+    for unit_idx, unit in enumerate(units):
+        for idx in unit:
+            box_units[idx].append(unit_idx)
+    linked = [set() for _ in box_names]
+    for i, j in links:
+        linked[i].add(j)
+        linked[j].add(i)
+    peers = []
+    for idx, member_units in enumerate(box_units):
+        box_peers = set(peer for u in member_units for peer in units[u]) | linked[idx]
+        peers.append(tuple(sorted(box_peers - {idx})))
+    peer_masks = tuple(sum(1 << peer for peer in box_peers) for box_peers in peers)
+    size = len(digits)
+    return BoardTables(order or int(round(size ** 0.5)), size, digits, tuple(box_names), units,
+                       tuple(tuple(u) for u in box_units), tuple(peers), peer_masks)
+
+
+def unit_tables(unitlist, boxes, digits=cols):
+    """Build BoardTables from a unitlist of box names (e.g., solution.unitlist)
+
+    Parameters
+    ----------
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    Returns
+    -------
+    BoardTables
+    """
+    index = {box: idx for idx, box in enumerate(boxes)}
+    return index_tables([[index[box] for box in unit] for unit in unitlist], boxes, digits)
+
+
+@lru_cache()
+def board_tables(order=3, diagonal=False):
+    """Build (once per order) the BoardTables for an order**2 x order**2 board
+
+    The units are listed in the same order as solution.unitlist: rows, then
+    columns, then square units, then (optionally) the two main diagonals.
+
+    Parameters
+    ----------
+    order(int)
+        the side length of each square unit, e.g. 3, 4 or 5 for 9x9, 16x16
+        or 25x25 boards
+
+    diagonal(bool)
+        whether the two main diagonals are also units
+
+    Returns
+    -------
+    BoardTables
+    """
+    size = order * order
+    if size > len(DIGITS):
+        raise ValueError("boards larger than {0}x{0} are not supported".format(len(DIGITS)))
+    units = [[r * size + c for c in range(size)] for r in range(size)]
+    units += [[r * size + c for r in range(size)] for c in range(size)]
+    units += [[(br + r) * size + bc + c for r in range(order) for c in range(order)]
+              for br in range(0, size, order) for bc in range(0, size, order)]
+    if diagonal:
+        units += [[i * size + i for i in range(size)], [i * size + size - 1 - i for i in range(size)]]
+    box_names = [ROWS[r] + str(c + 1) for r in range(size) for c in range(size)]
+    return index_tables(units, box_names, DIGITS[:size], order)
+
+
 def assign_value(values, box, value):
     """You must use this function to update your values dictionary if you want to
     try using the provided visualization tool. This function records each assignment
-    (in order) for later reconstruction.
+    (in order) for later reconstruction when `history.enabled` is True.
 
     Parameters
     ----------
@@ -85,12 +280,16 @@ def assign_value(values, box, value):
     if values[box] == value:
         return values
 
-    prev = values2grid(values)
     values[box] = value
-    if len(value) == 1:
-        history[values2grid(values)] = (prev, (box, value))
+    if history.enabled and len(value) == 1:
+        history.record(box, value)
     return values
 
+def count_candidates(values):
+    """ The total number of candidate digits left in a values dictionary """
+    return sum(len(value) for value in values.values())
+
+
 def cross(A, B):
     """Cross product of elements in A and elements in B """
     return [x+y for x in A for y in B]
@@ -168,10 +367,10 @@ def reconstruct(values, history):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
-    history(dict)
-        a dictionary of the form {key: (key, (box, value))} encoding a linked
-        list where each element points to the parent and identifies the value
-        assignment that connects from the parent to the current state
+    history(HistoryLog)
+        the assignment log recorded by assign_value while solving; the path
+        is replayed from the current head of the log, which is the last
+        assignment on the way to `values`
 
     Returns
     -------
@@ -179,9 +378,4 @@ def reconstruct(values, history):
         a list of (box, value) assignments that can be applied in order to the
         starting Sudoku puzzle to reach the solution
     """
-    path = []
-    prev = values2grid(values)
-    while prev in history:
-        prev, step = history[prev]
-        path.append(step)
-    return path[::-1]
+    return history.path()
@@ -0,0 +1,250 @@
+"""Declarative rules for Sudoku variants, compiled for the bitboard engine
+
+A variant is described by a small spec (a dict that can be written as JSON):
+
+    {
+        "order": 3,                      # 3 for 9x9 boards (the default)
+        "diagonal": true,                # the two main diagonals are units
+        "regions": "111222333...",       # jigsaw: one region label per box
+                                         # (replaces the square units)
+        "cages": [[15, ["A1", "A2"]]],   # killer cages: [sum, boxes]
+        "anti_knight": true,             # no digit repeats a knight's move away
+        "anti_king": true,               # ... or a king's move away
+        "non_consecutive": true          # orthogonal neighbours never differ by 1
+    }
+
+compile_spec turns a spec into a Variant once (the result is cached per
+spec): the units and every pairwise "must differ" rule (killer cages, knight
+and king moves) become the index tables of a utils.BoardTables, which
+bitboard.propagate handles directly, and the rules that are not all-different
+constraints become propagators: one per killer cage (the digit combinations
+that still reach the cage sum) and one for the non-consecutive rule.
+
+Note that only bitboard.propagate understands the extra peers, so variants are
+solved with the search in this module rather than dlx or vectorized.
+"""
+import json
+
+from collections import namedtuple
+from functools import lru_cache
+from itertools import combinations
+
+import bitboard
+
+from utils import DIGITS, ROWS, index_tables
+
+
+Variant = namedtuple('Variant', ['tables', 'cages', 'neighbours'])
+Variant.__doc__ = """A compiled variant spec
+
+Attributes
+----------
+tables : BoardTables
+    The units and peers of the board (including the pairwise rules)
+
+cages : tuple
+    One (box indices, digit combination masks) pair per killer cage; each
+    combination is a mask of distinct digits that adds up to the cage sum
+
+neighbours : tuple
+    For the non-consecutive rule, the orthogonal neighbours of each box
+    (empty when the rule is off)
+"""
+
+KNIGHT_MOVES = [(1, 2), (2, 1), (2, -1), (1, -2)]
+KING_MOVES = [(0, 1), (1, 1), (1, 0), (1, -1)]
+
+
+def compile_spec(spec):
+    """Compile a variant spec (see the module docstring) into a Variant
+
+    Raises
+    ------
+    ValueError
+        If the spec has unknown keys, or a region or cage is malformed
+    """
+    return _compile(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=64)
+def _compile(key):
+    spec = json.loads(key)
+    unknown = set(spec) - {'order', 'diagonal', 'regions', 'cages', 'anti_knight', 'anti_king',
+                           'non_consecutive'}
+    if unknown:
+        raise ValueError("unknown variant rules: {}".format(sorted(unknown)))
+    order = spec.get('order', 3)
+    size = order * order
+    box_names = [ROWS[r] + str(c + 1) for r in range(size) for c in range(size)]
+    index = {box: idx for idx, box in enumerate(box_names)}
+
+    units = [[r * size + c for c in range(size)] for r in range(size)]
+    units += [[r * size + c for r in range(size)] for c in range(size)]
+    if spec.get('regions'):
+        units += _regions(spec['regions'], size)
+    else:
+        units += [[(br + r) * size + bc + c for r in range(order) for c in range(order)]
+                  for br in range(0, size, order) for bc in range(0, size, order)]
+    if spec.get('diagonal'):
+        units += [[i * size + i for i in range(size)], [i * size + size - 1 - i for i in range(size)]]
+
+    links = set()
+    cages = []
+    for total, cage_boxes in spec.get('cages', []):
+        try:
+            cage = tuple(index[box] for box in cage_boxes)
+        except KeyError as e:
+            raise ValueError("unknown box {} in cage {}".format(e, cage_boxes))
+        links.update(combinations(cage, 2))
+        combos = tuple(sum(1 << (d - 1) for d in digits)
+                       for digits in combinations(range(1, size + 1), len(cage))
+                       if sum(digits) == total)
+        if not combos:
+            raise ValueError("no {} distinct digits add up to {}".format(len(cage), total))
+        cages.append((cage, combos))
+    if spec.get('anti_knight'):
+        links.update(_moves(KNIGHT_MOVES, size))
+    if spec.get('anti_king'):
+        links.update(_moves(KING_MOVES, size))
+
+    neighbours = ()
+    if spec.get('non_consecutive'):
+        neighbours = tuple(tuple(nr * size + nc for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                                 if 0 <= nr < size and 0 <= nc < size)
+                           for r in range(size) for c in range(size))
+
+    tables = index_tables(units, box_names, DIGITS[:size], order, links)
+    return Variant(tables, tuple(cages), neighbours)
+
+
+def _regions(labels, size):
+    if len(labels) != size * size:
+        raise ValueError("regions must have one label per box, found {}".format(len(labels)))
+    regions = {}
+    for idx, label in enumerate(labels):
+        regions.setdefault(label, []).append(idx)
+    if len(regions) != size or any(len(region) != size for region in regions.values()):
+        raise ValueError("regions must be {0} groups of {0} boxes".format(size))
+    return list(regions.values())
+
+
+def _moves(moves, size):
+    for r in range(size):
+        for c in range(size):
+            for dr, dc in moves:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < size and 0 <= nc < size:
+                    yield (r * size + c, nr * size + nc)
+
+
+def apply_rules(board, variant):
+    """Apply the cage sum and non-consecutive propagators once
+
+    Returns
+    -------
+    list or False
+        The indices of the boxes that changed, or False if a contradiction
+        was found
+    """
+    changed = []
+    for cage, combos in variant.cages:
+        union = fixed = 0
+        for idx in cage:
+            mask = board[idx]
+            union |= mask
+            if not mask & (mask - 1):
+                fixed |= mask
+        allowed = 0
+        for combo in combos:
+            if combo & union == combo and combo & fixed == fixed and \
+                    all(board[idx] & combo for idx in cage):
+                allowed |= combo
+        for idx in cage:
+            mask = board[idx] & allowed
+            if mask != board[idx]:
+                if not mask:
+                    return False
+                board[idx] = mask
+                changed.append(idx)
+    for idx, neighbours in enumerate(variant.neighbours):
+        mask = board[idx]
+        if not mask & (mask - 1):
+            keep = ~(mask << 1 | mask >> 1)
+            for other in neighbours:
+                if board[other] & ~keep:
+                    board[other] &= keep
+                    if not board[other]:
+                        return False
+                    changed.append(other)
+    return changed
+
+
+def reduce_puzzle(board, variant, changed=None):
+    """Alternate bitboard.propagate and the variant propagators until neither
+    makes progress
+
+    Returns
+    -------
+    list or False
+        The reduced bitboard, or False if the puzzle is unsolvable
+    """
+    while True:
+        if bitboard.propagate(board, variant.tables, changed) is False:
+            return False
+        changed = apply_rules(board, variant)
+        if changed is False:
+            return False
+        if not changed:
+            return board
+
+
+def search(board, variant):
+    """Depth first search with the variant's constraint propagation
+
+    Returns
+    -------
+    list or False
+        The solved bitboard, or False if the puzzle is unsolvable
+    """
+    if reduce_puzzle(board, variant) is False:
+        return False
+    return _search(board, variant)
+
+
+def _search(board, variant):
+    best = bitboard.select_box(board, variant.tables)
+    if best is None:
+        return board
+    mask = board[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        attempt = board[:]
+        attempt[best] = bit
+        if reduce_puzzle(attempt, variant, (best,)) is not False:
+            attempt = _search(attempt, variant)
+            if attempt:
+                return attempt
+    return False
+
+
+def solve(grid, spec):
+    """Find the solution to a Sudoku variant
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid ('.' for empty boxes; killer
+        puzzles are often completely empty)
+
+    spec(dict)
+        the variant rules (see the module docstring)
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    variant = compile_spec(spec)
+    board = search(bitboard.grid2bits(grid, variant.tables), variant)
+    return bitboard.bits2values(board, variant.tables) if board else False
@@ -0,0 +1,180 @@
+"""Vectorized constraint propagation over a batch of Sudoku puzzles
+
+A batch of B puzzles is a (B, boxes, digits) boolean candidate tensor, e.g.
+(B, 81, 9) for 9x9 boards, where cand[b, i, d] is True when digit d + 1 is
+still a candidate for box i of puzzle b. The eliminate and only choice
+strategies are applied to every puzzle at once with NumPy matrix products
+built from the unit and peer index arrays of a utils.BoardTables (by default
+the tables that bitboard.py builds from solution.unitlist, so the diagonal
+units are included). Puzzles that propagation alone cannot solve are handed
+back to the scalar bitboard search.
+
+Requires NumPy.
+"""
+import numpy as np
+
+import bitboard
+
+
+SOLVED, UNSOLVED, CONTRADICTION = 1, 0, -1
+
+
+class IndexArrays:
+    """Index arrays and incidence matrices for a BoardTables
+
+    The peer and unit lists of a box can have different lengths (e.g., boxes on
+    a diagonal have more peers), so the peer rows are padded with the index of
+    an extra sentinel column that is dropped from the incidence matrix.
+
+    Attributes
+    ----------
+    peers : ndarray (boxes, max_peers)
+        The peer indices of each box, padded with len(boxes)
+
+    units : ndarray (units, size)
+        The box indices of each unit
+
+    peer_matrix : ndarray (boxes, boxes)
+        peer_matrix[i, j] is 1 when box j is a peer of box i
+
+    unit_matrix : ndarray (units, boxes)
+        unit_matrix[u, i] is 1 when box i belongs to unit u
+    """
+    def __init__(self, tables):
+        n, n_units = len(tables.boxes), len(tables.units)
+        self.size = tables.size
+        width = max(len(row) for row in tables.peers)
+        self.peers = np.full((n, width), n, dtype=np.intp)
+        for idx, row in enumerate(tables.peers):
+            self.peers[idx, :len(row)] = row
+        self.units = np.array(tables.units, dtype=np.intp)
+
+        # gathering through the index arrays one box at a time is far slower
+        # than a matrix product, so the same structure is also kept as dense
+        # 0/1 matrices that propagate multiplies the whole batch by
+        peer_matrix = np.zeros((n, n + 1), dtype=np.float32)
+        np.put_along_axis(peer_matrix, self.peers, 1., axis=1)
+        self.peer_matrix = np.ascontiguousarray(peer_matrix[:, :n])
+        self.unit_matrix = np.zeros((n_units, n), dtype=np.float32)
+        np.put_along_axis(self.unit_matrix, self.units, 1., axis=1)
+
+
+_index_arrays = {}
+
+
+def index_arrays(tables):
+    """ Return the (cached) IndexArrays for a BoardTables """
+    key = id(tables)
+    if key not in _index_arrays:
+        _index_arrays[key] = (tables, IndexArrays(tables))
+    return _index_arrays[key][1]
+
+
+def grids2tensor(grids, tables=None):
+    """Convert a list of grid strings to a (B, boxes, digits) candidate tensor
+
+    Parameters
+    ----------
+    grids(list)
+        a list of strings representing sudoku grids ('.' for empty boxes)
+
+    Returns
+    -------
+    ndarray
+        a boolean candidate tensor
+    """
+    tables = tables or bitboard.tables_for(grids[0])
+    digits = np.frombuffer(tables.digits.encode(), dtype=np.uint8)
+    chars = np.frombuffer(''.join(grids).encode(), dtype=np.uint8).reshape(len(grids), -1)
+    cand = chars[:, :, None] == digits[None, None, :]
+    cand[~cand.any(axis=2)] = True
+    return cand
+
+
+def tensor2bits(cand):
+    """ Convert a (B, boxes, digits) candidate tensor to a list of bitboards """
+    weights = 1 << np.arange(cand.shape[2], dtype=np.int64)
+    return (cand.astype(np.int64) @ weights).tolist()
+
+
+def propagate(cand, tables=None, max_passes=100):
+    """Apply eliminate and only choice to every puzzle in the batch until no
+    candidates change
+
+    Each pass works on the puzzles that changed in the previous pass, so
+    puzzles that are finished (or stuck) early drop out of the computation.
+
+    Parameters
+    ----------
+    cand(ndarray)
+        a (B, boxes, digits) boolean candidate tensor (updated in place)
+
+    Returns
+    -------
+    (ndarray, ndarray)
+        The propagated candidate tensor, and a status for each puzzle: SOLVED,
+        UNSOLVED (still needs search) or CONTRADICTION
+    """
+    tables = tables or bitboard.tables_for(range(cand.shape[1]))
+    ix = index_arrays(tables)
+    ones = np.ones(ix.size, dtype=np.float32)
+    failed = np.zeros(cand.shape[0], dtype=bool)
+    active = np.arange(cand.shape[0])
+
+    # candidates are kept as 0/1 float32 while propagating so that every count
+    # is a matrix product (summing over boolean axes is several times slower)
+    work = cand.astype(np.float32)
+    for _ in range(max_passes):
+        if not active.size:
+            break
+        sub = work[active]
+        before = sub.copy()
+
+        # eliminate: remove the digit of every solved box from its peers
+        solved = sub * (sub @ ones == 1).astype(np.float32)[:, :, None]
+        sub *= ((ix.peer_matrix @ solved) == 0).astype(np.float32)
+
+        # only choice: a digit with one place left in a unit goes in that place
+        counts = ix.unit_matrix @ sub
+        stuck = (counts == 0).any(axis=(1, 2))
+        hidden = sub * ((ix.unit_matrix.T @ (counts == 1).astype(np.float32)) > 0).astype(np.float32)
+        sub = np.where((hidden @ ones > 0)[:, :, None], hidden, sub)
+
+        stuck |= (sub @ ones == 0).any(axis=1)
+        work[active] = sub
+        failed[active] |= stuck
+        changed = (sub != before).any(axis=(1, 2))
+        active = active[changed & ~stuck]
+
+    cand[:] = work > 0
+    status = np.where((work @ ones == 1).all(axis=1), SOLVED, UNSOLVED)
+    status[failed] = CONTRADICTION
+    return cand, status
+
+
+def solve_batch(grids, tables=None):
+    """Solve a batch of puzzles with vectorized propagation, falling back to
+    bitboard.search for the puzzles that propagation alone does not solve
+
+    Parameters
+    ----------
+    grids(list)
+        a list of strings representing sudoku grids of the same size
+
+    Returns
+    -------
+    list
+        the solved grid string for each puzzle, or False if it has no solution
+    """
+    if not grids:
+        return []
+    tables = tables or bitboard.tables_for(grids[0])
+    cand, status = propagate(grids2tensor(grids, tables), tables)
+    results = []
+    for board, state in zip(tensor2bits(cand), status):
+        if state == UNSOLVED:
+            board = bitboard.search(board, tables)
+        elif state == CONTRADICTION:
+            board = False
+        results.append(bitboard.bits2grid(board, tables) if board else False)
+    return results
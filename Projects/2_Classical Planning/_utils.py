@@ -27,9 +27,17 @@ def run_search(problem, search_function, parameter=None):
     print("\n# Actions   Expansions   Goal Tests   New Nodes")
     print("{}\n".format(ip))
     show_solution(node, end - start)
+    show_cache_info(problem, parameter)
     print()
 
 
+def show_cache_info(problem, heuristic):
+    info = getattr(problem, 'heuristic_cache_info', dict)().get(getattr(heuristic, '__name__', None))
+    if info is not None:
+        print("Heuristic cache: {} hits  {} misses  {} evictions  {}/{} entries".format(
+            info.hits, info.misses, info.evictions, info.currsize, info.maxsize))
+
+
 def show_solution(node, elapsed_time):
     print("Plan length: {}  Time elapsed in seconds: {}".format(len(node.solution()), elapsed_time))
     for action in node.solution():
@@ -109,11 +117,12 @@ def conjunctive_sentence(pos_list, neg_list):
 
 def encode_state(fs, fluent_map):
     """ Convert a FluentState (list of positive fluents and negative fluents) into
-    an ordered sequence of True/False values.
+    an integer bitmask.
 
     It is sometimes convenient to encode a problem in terms of the specific
     fluents that are True or False in a state, but other times it is easier (or faster)
-    to perform computations on an an array of booleans.
+    to perform computations on a bitmask: applying an action or testing a goal
+    is then a few bitwise operations (see fluent_mask).
 
     Parameters
     ----------
@@ -125,37 +134,73 @@ def encode_state(fs, fluent_map):
     
     Returns
     -------
-    tuple of True/False elements corresponding to the fluents in fluent_map
+    int where bit i is set if and only if fluent_map[i] is True in the state
     """
-    return tuple([f in fs.pos for f in fluent_map])
+    return fluent_mask(fs.pos, fluent_map)
 
 
 def decode_state(state, fluent_map):
-    """ Convert an ordered list of True/False values into a FluentState
-    (list of positive fluents and negative fluents)
+    """ Convert an integer bitmask into a FluentState (list of positive fluents
+    and negative fluents)
 
     It is sometimes convenient to encode a problem in terms of the specific
     fluents that are True or False in a state, but other times it is easier (or faster)
-    to perform computations on an an array of booleans.
+    to perform computations on a bitmask.
 
     Parameters
     ----------
     state:
-        A state represented as an ordered sequence of True/False values
+        A state represented as an integer bitmask (see encode_state)
 
     fluent_map:
         An ordered sequence of fluents
 
     Returns
     -------
-    FluentState instance containing the fluents from fluent_map corresponding to True
-    entries from the input state in the pos_list, and containing the fluents from
-    fluent_map corresponding to False entries in the neg_list
+    FluentState instance containing the fluents from fluent_map corresponding to set
+    bits of the input state in the pos_list, and containing the fluents from
+    fluent_map corresponding to clear bits in the neg_list
     """
     fs = FluentState(set(), set())
-    for idx, elem in enumerate(state):
-        if elem:
-            fs.pos.append(fluent_map[idx])
+    for idx, fluent in enumerate(fluent_map):
+        if state >> idx & 1:
+            fs.pos.append(fluent)
         else:
-            fs.neg.append(fluent_map[idx])
+            fs.neg.append(fluent)
     return fs
+
+
+def fluent_mask(fluents, fluent_map):
+    """ Convert a collection of fluents into a bitmask over fluent_map
+
+    Fluents that do not appear in fluent_map are ignored.
+
+    Parameters
+    ----------
+    fluents:
+        An iterable collection of fluents
+
+    fluent_map:
+        An ordered sequence of fluents (or a dict mapping each fluent to its
+        position, which is faster when building many masks)
+
+    Returns
+    -------
+    int with bit i set for every fluent in `fluents` at position i of fluent_map
+    """
+    if not isinstance(fluent_map, dict):
+        fluent_map = {f: i for i, f in enumerate(fluent_map)}
+    mask = 0
+    for f in fluents:
+        idx = fluent_map.get(f)
+        if idx is not None:
+            mask |= 1 << idx
+    return mask
+
+
+def bit_indices(mask):
+    """ Yield the positions of the set bits of an integer bitmask in increasing order """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
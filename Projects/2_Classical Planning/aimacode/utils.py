@@ -8,9 +8,9 @@ import os.path
 import random
 import math
 
-import heapq
+import itertools
 from functools import lru_cache
-from collections import namedtuple, deque, Counter, defaultdict
+from collections import namedtuple, deque, Counter, defaultdict, OrderedDict
 
 # ______________________________________________________________________________
 # Functions on Sequences and Iterables
@@ -69,10 +69,72 @@ def is_in(elt, seq):
 # TODO: Use functools.lru_cache memoization decorator
 
 
-def memoize(fn, slot=None):
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entry when it is
+    full, and counts hits, misses and evictions (see cache_info).
+
+    A maxsize of None makes the cache unbounded.
+
+    MODIFIED FROM AIMA VERSION
+        - Added to bound the memory used by memoize and by cached heuristics
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self.data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the value for key (marking it as recently used) or default,
+        counting a hit or a miss"""
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if self.maxsize is not None and len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.data))
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        self.data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+_missing = object()
+
+
+def memoize(fn, slot=None, maxsize=None):
     """Memoize fn: make it remember the computed value for any argument list.
     If slot is specified, store result in that slot of first argument.
-    If slot is false, store results in a dictionary."""
+    If slot is false, store results in an LRUCache of at most maxsize entries
+    (unbounded by default)."""
     if slot:
         def memoized_fn(obj, *args):
             if hasattr(obj, slot):
@@ -83,11 +145,12 @@ def memoize(fn, slot=None):
                 return val
     else:
         def memoized_fn(*args):
-            if args not in memoized_fn.cache:
-                memoized_fn.cache[args] = fn(*args)
-            return memoized_fn.cache[args]
+            val = memoized_fn.cache.get(args, _missing)
+            if val is _missing:
+                val = memoized_fn.cache[args] = fn(*args)
+            return val
 
-        memoized_fn.cache = {}
+        memoized_fn.cache = LRUCache(maxsize)
 
     return memoized_fn
 
@@ -312,9 +375,8 @@ class Queue:
         q.extend(items) -- equivalent to: for item in items: q.append(item)
         q.pop()         -- return the top item from the queue
         len(q)          -- number of items in q (also q.__len())
-        item in q       -- does q contain item?
-    Note that isinstance(Stack(), Queue) is false, because we implement stacks
-    as lists.  If Python ever gets interfaces, Queue will be an interface."""
+        item in q       -- does q contain item? (a constant time lookup)
+    If Python ever gets interfaces, Queue will be an interface."""
 
     def __init__(self):
         raise NotImplementedError
@@ -325,8 +387,37 @@ class Queue:
 
 
 def Stack():
-    """Return an empty list, suitable as a Last-In-First-Out Queue."""
-    return []
+    """Return an empty Last-In-First-Out Queue."""
+    return LIFOQueue()
+
+
+class LIFOQueue(Queue):
+    """A Last-In-First-Out Queue implemented with a list
+
+    MODIFIED FROM AIMA VERSION
+        - Replaces the plain list returned by Stack(), which made every
+          membership test a linear scan
+        - Use an additional Counter to track membership (items can be queued
+          more than once, e.g. by tree_search)
+    """
+    def __init__(self):
+        self.A = []
+        self.__keys = Counter()
+
+    def append(self, item):
+        self.A.append(item)
+        self.__keys[item] += 1
+
+    def __len__(self):
+        return len(self.A)
+
+    def pop(self):
+        key = self.A.pop()
+        _uncount(self.__keys, key)
+        return key
+
+    def __contains__(self, item):
+        return item in self.__keys
 
 
 class FIFOQueue(Queue):
@@ -334,60 +425,134 @@ class FIFOQueue(Queue):
     
     MODIFIED FROM AIMA VERSION
         - Use deque
-        - Use an additional dict to track membership
+        - Use an additional Counter to track membership (items can be queued
+          more than once, e.g. by tree_search)
     """
     def __init__(self):
         self.A = deque()
-        self.__keys = set()
+        self.__keys = Counter()
 
     def append(self, item):
         self.A.append(item)
-        self.__keys.add(item)
+        self.__keys[item] += 1
 
     def __len__(self):
         return len(self.A)
 
     def pop(self):
         key = self.A.popleft()
-        self.__keys.discard(key)
+        _uncount(self.__keys, key)
         return key
 
     def __contains__(self, item):
         return item in self.__keys
 
 
+def _uncount(counter, key):
+    """Remove one copy of key from a Counter, dropping keys that reach zero"""
+    if counter[key] > 1:
+        counter[key] -= 1
+    else:
+        del counter[key]
+
+
 class PriorityQueue(Queue):
     """A queue in which the minimum element (as determined by f and
     order) is returned first.  Also supports dict-like lookup.
 
     MODIFIED FROM AIMA VERSION
-        - Use heapq
-        - Use an additional dict to track membership
+        - Use an indexed binary heap: the queue holds at most one entry for
+          items that compare equal (e.g., search nodes with the same state),
+          and a dict maps each item to its position in the heap
+        - Appending an item equal to one already in the queue replaces it
+          and moves it to its new place (decrease-key); del q[item] removes
+          an item in O(log n)
+        - Ties between equal priorities are broken by tie(item) if it is
+          given (smaller first), otherwise in insertion order
     """
 
-    def __init__(self, order=None, f=lambda x: x):
-        self.A = []
-        self._A = Counter()
+    def __init__(self, order=min, f=lambda x: x, tie=None):
+        self.A = []  # [(priority, tie), item] entries
+        self.index = {}
+        self.sign = -1 if order is max else 1
         self.f = f
+        self.tie = tie
+        self.counter = itertools.count()
 
     def append(self, item):
-        heapq.heappush(self.A, (self.f(item), item))
-        self._A[item] += 1
+        priority = self.f(item)
+        if self.sign < 0:
+            priority = -priority
+        key = (priority, self.tie(item) if self.tie else next(self.counter))
+        pos = self.index.get(item)
+        if pos is None:
+            self.A.append([key, item])
+            self.index[item] = len(self.A) - 1
+            self._sift_up(len(self.A) - 1)
+        else:
+            del self.index[item]
+            self.A[pos] = [key, item]
+            self.index[item] = pos
+            self._sift_up(pos)
+            self._sift_down(self.index[item])
 
     def __len__(self):
         return len(self.A)
 
     def pop(self):
-        _, item = heapq.heappop(self.A)
-        self._A[item] -= 1
+        item = self.A[0][1]
+        self._remove(0)
         return item
 
     def __contains__(self, item):
-        return self._A[item] > 0
+        return item in self.index
 
     def __getitem__(self, key):
-        if self._A[key] > 0:
-            return key
+        """Return the queued item equal to key"""
+        return self.A[self.index[key]][1]
+
+    def __delitem__(self, key):
+        self._remove(self.index[key])
+
+    def _remove(self, pos):
+        A = self.A
+        del self.index[A[pos][1]]
+        last = A.pop()
+        if pos < len(A):
+            A[pos] = last
+            self.index[last[1]] = pos
+            self._sift_up(pos)
+            self._sift_down(self.index[last[1]])
+
+    def _sift_up(self, pos):
+        A, index = self.A, self.index
+        entry = A[pos]
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if not entry[0] < A[parent][0]:
+                break
+            A[pos] = A[parent]
+            index[A[pos][1]] = pos
+            pos = parent
+        A[pos] = entry
+        index[entry[1]] = pos
+
+    def _sift_down(self, pos):
+        A, index = self.A, self.index
+        entry, size = A[pos], len(A)
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and A[child + 1][0] < A[child][0]:
+                child += 1
+            if not A[child][0] < entry[0]:
+                break
+            A[pos] = A[child]
+            index[A[pos][1]] = pos
+            pos = child
+        A[pos] = entry
+        index[entry[1]] = pos
 
 # ______________________________________________________________________________
 # Useful Shorthands
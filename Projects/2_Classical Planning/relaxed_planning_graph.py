@@ -0,0 +1,103 @@
+
+from itertools import chain
+
+
+class RelaxedPlanningGraph:
+    """ Level costs of the goals of a planning problem, computed without
+    building PlanningGraph layers
+
+    Every literal (each fluent in problem.state_map and its negation) and
+    every action gets an integer id when the problem is compiled, once per
+    problem. Evaluating a state then propagates levels with one counter per
+    action: the counter starts at the number of preconditions and is
+    decremented as each precondition first appears, so an action is applied
+    exactly once, in the level after its last precondition appears (the same
+    level PlanningGraph._extend adds it at). Mutexes never prevent an action
+    from being added to a planning graph, so the level costs are the same as
+    those of PlanningGraph with or without mutexes.
+
+    All the per-state data lives in local lists, so one instance can be
+    shared by every node of a search.
+
+    Parameters
+    ----------
+    problem : BasePlanningProblem
+        The problem whose state_map, actions_list and goal are compiled
+    """
+    def __init__(self, problem):
+        n = len(problem.state_map)
+        literal_ids = {f: i for i, f in enumerate(problem.state_map)}
+        literal_ids.update({~f: n + i for i, f in enumerate(problem.state_map)})
+        self.num_fluents = n
+
+        consumers = [[] for _ in range(2 * n)]
+        preconditions = []
+        effects = []
+        for action in problem.actions_list:
+            precond = [literal_ids.get(p) for p in chain(action.precond_pos,
+                                                         (~p for p in action.precond_neg))]
+            if None in precond:
+                continue  # needs a literal outside state_map, so it is never applicable
+            idx = len(effects)
+            for literal in precond:
+                consumers[literal].append(idx)
+            preconditions.append(len(precond))
+            effects.append(tuple(literal_ids[e] for e in chain(action.effect_add,
+                                                               (~e for e in action.effect_rem))))
+        self.consumers = tuple(tuple(c) for c in consumers)
+        self.preconditions = tuple(preconditions)
+        self.effects = tuple(effects)
+        self.free_actions = tuple(idx for idx, count in enumerate(preconditions) if count == 0)
+        # goals outside of state_map can never appear in the graph
+        self.goals = tuple(literal_ids.get(g, -1) for g in problem.goal)
+
+    def goal_levels(self, state):
+        """ Return the level cost of each goal from the given state
+
+        Parameters
+        ----------
+        state : int
+            A state bitmask (see _utils.encode_state)
+
+        Returns
+        -------
+        list
+            The level at which each goal in problem.goal first appears, or
+            float('inf') for goals that can never be reached
+        """
+        n = self.num_fluents
+        inf = float('inf')
+        levels = [inf] * (2 * n)
+        current = [i if state >> i & 1 else n + i for i in range(n)]
+        for literal in current:
+            levels[literal] = 0
+        pending = sum(1 for g in self.goals if g >= 0 and levels[g])
+
+        remaining = list(self.preconditions)
+        ready = list(self.free_actions)
+        consumers, effects = self.consumers, self.effects
+        depth = 0
+        while pending and current:
+            for literal in current:
+                for action in consumers[literal]:
+                    remaining[action] -= 1
+                    if not remaining[action]:
+                        ready.append(action)
+            depth += 1
+            current = []
+            for action in ready:
+                for literal in effects[action]:
+                    if levels[literal] == inf:
+                        levels[literal] = depth
+                        current.append(literal)
+            ready = []
+            pending = sum(1 for g in self.goals if g >= 0 and levels[g] == inf)
+        return [levels[g] if g >= 0 else inf for g in self.goals]
+
+    def levelsum(self, state):
+        """ The sum of the level costs of the goals (see PlanningGraph.h_levelsum) """
+        return sum(self.goal_levels(state))
+
+    def maxlevel(self, state):
+        """ The largest level cost of any goal (see PlanningGraph.h_maxlevel) """
+        return max(self.goal_levels(state), default=0)
@@ -0,0 +1,115 @@
+
+import unittest
+
+from itertools import combinations
+
+from aimacode.search import Node
+from air_cargo_problems import air_cargo_p1
+from example_have_cake import have_cake
+from layers import EdgeMap
+from my_planning_graph import ActionLayer, LiteralLayer, PlanningGraph
+
+
+class TestBitsetMutexes(unittest.TestCase):
+    """ Compare the bitset mutexes of each layer with the pairwise mutex tests """
+
+    def check_graph(self, pg):
+        for layer in pg.action_layers:
+            for actionA, actionB in combinations(layer, 2):
+                expected = ((layer._serialize and not actionA.no_op and not actionB.no_op)
+                            or layer._inconsistent_effects(actionA, actionB)
+                            or layer._interference(actionA, actionB)
+                            or (not layer._ignore_mutexes and layer._competing_needs(actionA, actionB)))
+                self.assertEqual(layer.is_mutex(actionA, actionB), expected, (actionA, actionB))
+                self.assertEqual(layer.is_mutex(actionB, actionA), expected)
+        for layer in pg.literal_layers:
+            for literalA, literalB in combinations(layer, 2):
+                expected = (layer._negation(literalA, literalB)
+                            or (not layer._ignore_mutexes and len(layer.parent_layer) > 0
+                                and layer._inconsistent_support(literalA, literalB)))
+                self.assertEqual(layer.is_mutex(literalA, literalB), expected, (literalA, literalB))
+
+    def test_cake(self):
+        problem = have_cake()
+        for serialize in (True, False):
+            self.check_graph(PlanningGraph(problem, problem.initial, serialize=serialize).fill())
+
+    def test_air_cargo(self):
+        problem = air_cargo_p1()
+        self.check_graph(PlanningGraph(problem, problem.initial, serialize=False).fill())
+        self.check_graph(PlanningGraph(problem, problem.initial, ignore_mutexes=True).fill())
+
+    def test_set_mutex(self):
+        problem = have_cake()
+        layer = PlanningGraph(problem, problem.initial).literal_layers[0]
+        eaten, have = problem.state_map
+        self.assertFalse(layer.is_mutex(have, ~eaten))
+        layer.set_mutex(have, ~eaten)
+        self.assertTrue(layer.is_mutex(~eaten, have))
+        self.assertEqual(layer._mutexes[have], {~eaten})
+
+
+class TestSharedLayers(unittest.TestCase):
+    def setUp(self):
+        self.problem = air_cargo_p1()
+        self.pg = PlanningGraph(self.problem, self.problem.initial, serialize=False).fill()
+
+    def check_level_off(self, pg):
+        layers = pg.literal_layers
+        for parent, layer in zip(layers, layers[1:]):
+            leveled = layer.added == 0 and layer.mutex_count == parent.mutex_count
+            self.assertEqual(leveled, layer == parent)
+        self.assertEqual(layers[-1], layers[-2])
+        self.assertNotEqual(layers[-2], layers[-3])
+
+    def test_level_off(self):
+        self.check_level_off(self.pg)
+
+    def test_serialized_setlevel(self):
+        # baseline values from the planning graph before layers shared storage
+        self.check_level_off(PlanningGraph(self.problem, self.problem.initial, serialize=True).fill())
+        self.assertEqual(self.problem.h_pg_setlevel(Node(self.problem.initial)), 4)
+        child = self.problem.result(self.problem.initial, self.problem.actions(self.problem.initial)[0])
+        self.assertEqual(self.problem.h_pg_setlevel(Node(child)), 4)
+
+    def test_edges_are_shared(self):
+        first, second = self.pg.action_layers[:2]
+        for action in first:
+            self.assertIs(second.parents[action], first.parents[action])
+        action = next(iter(first))
+        literal = next(iter(first.children[action]))
+        edges = set(second.children[action])
+        second.add_outbound_edges(action, [~literal])
+        self.assertEqual(second.children[action], edges | {~literal})
+        self.assertNotIn(~literal, first.children[action])
+
+    def test_edge_map(self):
+        base = EdgeMap()
+        base.add('a', [1])
+        edges = EdgeMap(base)
+        edges.add('a', [2])
+        edges.add('b', [3])
+        self.assertEqual(base['a'], {1})
+        self.assertEqual(dict(edges), {'a': {1, 2}, 'b': {3}})
+        self.assertEqual(edges['c'], set())
+        self.assertNotIn('c', edges)
+
+    def test_sibling_layers(self):
+        base = LiteralLayer(self.problem.state_map[:2], ActionLayer())
+        left, right = LiteralLayer(base), LiteralLayer(base)
+        left.add(self.problem.state_map[2])
+        right.add(self.problem.state_map[3])
+        base.add(self.problem.state_map[4])
+        self.assertEqual(set(left), set(self.problem.state_map[:3]))
+        self.assertEqual(set(right), set(self.problem.state_map[:2] + [self.problem.state_map[3]]))
+        self.assertEqual(set(base), set(self.problem.state_map[:2] + [self.problem.state_map[4]]))
+        self.assertEqual((left.added, right.added, len(base)), (1, 1, 3))
+        right.set_mutex(self.problem.state_map[1], self.problem.state_map[3])
+        self.assertEqual(right.mutex_count, 1)
+        right.discard(self.problem.state_map[0])
+        self.assertEqual(len(right), 2)
+        self.assertTrue(right.is_mutex(self.problem.state_map[1], self.problem.state_map[3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
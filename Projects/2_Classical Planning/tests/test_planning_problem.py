@@ -0,0 +1,112 @@
+
+import unittest
+
+from aimacode.search import Node, astar_search, breadth_first_search
+from aimacode.utils import LRUCache, memoize
+from _utils import decode_state, encode_state, fluent_mask
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+
+
+class TestStateEncoding(unittest.TestCase):
+    def setUp(self):
+        self.problem = air_cargo_p1()
+
+    def test_round_trip(self):
+        fs = decode_state(self.problem.initial, self.problem.state_map)
+        self.assertEqual(encode_state(fs, self.problem.state_map), self.problem.initial)
+        self.assertEqual(len(fs.pos) + len(fs.neg), len(self.problem.state_map))
+
+    def test_fluent_mask(self):
+        state_map = self.problem.state_map
+        self.assertEqual(fluent_mask(state_map[:2], state_map), 0b11)
+        self.assertEqual(fluent_mask([state_map[3]], dict(zip(state_map, range(len(state_map))))), 0b1000)
+
+
+class TestBitmaskProblem(unittest.TestCase):
+    """ Compare the bitmask operations with the literal definitions on FluentStates """
+
+    def check_state(self, problem, state):
+        fs = decode_state(state, problem.state_map)
+        expected = [a for a in problem.actions_list
+                    if all(p in fs.pos for p in a.precond_pos)
+                    and all(p in fs.neg for p in a.precond_neg)]
+        actions = problem.actions(state)
+        self.assertEqual(actions, expected)
+        for action in actions:
+            pos = (set(fs.pos) - action.effect_rem) | action.effect_add
+            child = decode_state(problem.result(state, action), problem.state_map)
+            self.assertEqual(set(child.pos), pos)
+        self.assertEqual(problem.goal_test(state), all(g in fs.pos for g in problem.goal))
+        return [problem.result(state, action) for action in actions]
+
+    def test_successors(self):
+        for problem in [have_cake(), air_cargo_p1(), air_cargo_p2()]:
+            frontier, seen = [problem.initial], {problem.initial}
+            while frontier and len(seen) < 200:
+                for child in self.check_state(problem, frontier.pop()):
+                    if child not in seen:
+                        seen.add(child)
+                        frontier.append(child)
+
+    def test_unmet_goals(self):
+        problem = air_cargo_p1()
+        self.assertEqual(problem.h_unmet_goals(Node(problem.initial)), 2)
+
+    def test_search(self):
+        problem = air_cargo_p1()
+        node = breadth_first_search(problem)
+        self.assertEqual(len(node.solution()), 6)
+        self.assertTrue(problem.goal_test(node.state))
+
+
+class TestHeuristicCache(unittest.TestCase):
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache['a'], cache['b'] = 1, 2
+        self.assertEqual(cache.get('a'), 1)
+        cache['c'] = 3
+        self.assertNotIn('b', cache)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(tuple(cache.cache_info()), (1, 1, 1, 2, 2))
+        cache.clear()
+        self.assertEqual(tuple(cache.cache_info()), (0, 0, 0, 2, 0))
+
+    def test_memoize(self):
+        calls = []
+        square = memoize(lambda x: calls.append(x) or x * x, maxsize=1)
+        self.assertEqual([square(2), square(2), square(3), square(2)], [4, 4, 9, 4])
+        self.assertEqual(calls, [2, 3, 2])
+        self.assertEqual(square.cache.cache_info().evictions, 2)
+
+    def test_keyed_by_state(self):
+        problem = air_cargo_p1()
+        self.assertEqual(problem.h_pg_levelsum(Node(problem.initial)),
+                         problem.h_pg_levelsum(Node(problem.initial)))
+        info = problem.heuristic_cache_info()['h_pg_levelsum']
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        self.assertEqual(air_cargo_p1().heuristic_cache_info(), {})
+
+    def test_bounded(self):
+        problem = air_cargo_p1()
+        problem.heuristic_cache_size = 8
+        node = astar_search(problem, problem.h_unmet_goals)
+        self.assertEqual(len(node.solution()), 6)
+        info = problem.heuristic_cache_info()['h_unmet_goals']
+        self.assertEqual(info.currsize, 8)
+        self.assertEqual(info.evictions, info.misses - 8)
+
+    def test_persistence(self):
+        problem = air_cargo_p1()
+        astar_search(problem, problem.h_unmet_goals)
+        first = problem.heuristic_cache_info()['h_unmet_goals']
+        astar_search(problem, problem.h_unmet_goals)
+        second = problem.heuristic_cache_info()['h_unmet_goals']
+        self.assertEqual(second.misses, first.misses)
+        self.assertGreater(second.hits, first.hits)
+        problem.clear_heuristic_caches()
+        self.assertEqual(problem.heuristic_cache_info(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+
+import random
+import unittest
+
+from aimacode.search import astar_search
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from my_planning_graph import PlanningGraph
+from relaxed_planning_graph import RelaxedPlanningGraph
+
+
+def random_states(problem, count, rng):
+    states, state = [problem.initial], problem.initial
+    for _ in range(count):
+        state = problem.result(state, rng.choice(problem.actions(state)))
+        states.append(state)
+    return states
+
+
+class TestRelaxedPlanningGraph(unittest.TestCase):
+    def test_matches_planning_graph(self):
+        rng = random.Random(0)
+        for problem in [have_cake(), air_cargo_p1(), air_cargo_p2()]:
+            rpg = RelaxedPlanningGraph(problem)
+            for state in random_states(problem, 20, rng):
+                pg = PlanningGraph(problem, state, serialize=True, ignore_mutexes=True)
+                self.assertEqual(rpg.levelsum(state), pg.h_levelsum())
+                pg = PlanningGraph(problem, state, serialize=True, ignore_mutexes=True)
+                self.assertEqual(rpg.maxlevel(state), pg.h_maxlevel())
+
+    def test_goal_reached(self):
+        problem = have_cake()
+        state = problem.result(problem.result(problem.initial, problem.actions_list[0]),
+                               problem.actions_list[1])
+        self.assertTrue(problem.goal_test(state))
+        self.assertEqual(problem.relaxed_graph.goal_levels(state), [0, 0])
+
+    def test_unreachable_goal(self):
+        problem = air_cargo_p1()
+        problem.goal = problem.goal + [~problem.state_map[0], problem.state_map[0]]
+        problem.actions_list = []
+        rpg = RelaxedPlanningGraph(problem)
+        self.assertEqual(rpg.maxlevel(problem.initial), float('inf'))
+
+    def test_astar(self):
+        problem = air_cargo_p2()
+        node = astar_search(problem, problem.h_pg_levelsum)
+        self.assertTrue(problem.goal_test(node.state))
+        self.assertIs(problem.relaxed_graph, problem.relaxed_graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+
+import random
+import unittest
+
+from aimacode.search import (
+    Node, astar_search, breadth_first_search, breadth_first_tree_search,
+    depth_first_graph_search, uniform_cost_search
+)
+from aimacode.utils import FIFOQueue, PriorityQueue, Stack
+from example_have_cake import have_cake
+from air_cargo_problems import air_cargo_p2
+
+
+class TestPriorityQueue(unittest.TestCase):
+    def check_heap(self, queue):
+        for pos, (key, item) in enumerate(queue.A):
+            self.assertEqual(queue.index[item], pos)
+            if pos:
+                self.assertFalse(key < queue.A[(pos - 1) // 2][0])
+        self.assertEqual(len(queue.index), len(queue))
+
+    def test_order(self):
+        rng = random.Random(0)
+        values = rng.sample(range(1000), 200)
+        queue = PriorityQueue(min, lambda x: x)
+        queue.extend(values)
+        self.check_heap(queue)
+        self.assertEqual([queue.pop() for _ in values], sorted(values))
+        queue = PriorityQueue(max, lambda x: x)
+        queue.extend(values)
+        self.assertEqual([queue.pop() for _ in values], sorted(values, reverse=True))
+
+    def test_decrease_key(self):
+        priority = {}
+        queue = PriorityQueue(min, lambda x: priority[x])
+        rng = random.Random(1)
+        for item in range(100):
+            priority[item] = rng.random()
+            queue.append(item)
+        for item in rng.sample(range(100), 50):
+            priority[item] = rng.random() - 0.5 if item % 2 else priority[item] + 1
+            queue.append(item)
+            self.check_heap(queue)
+        for item in rng.sample(range(100), 20):
+            del queue[item]
+            del priority[item]
+            self.check_heap(queue)
+        self.assertEqual(len(queue), 80)
+        self.assertEqual([queue.pop() for _ in range(80)], sorted(priority, key=priority.get))
+        self.assertNotIn(0, queue)
+
+    def test_lookup(self):
+        queue = PriorityQueue(min, lambda node: node.path_cost)
+        incumbent = Node(1, path_cost=5)
+        queue.append(incumbent)
+        self.assertIs(queue[Node(1, path_cost=2)], incumbent)
+        queue.append(Node(1, path_cost=2))
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.pop().path_cost, 2)
+
+    def test_tie_breaking(self):
+        queue = PriorityQueue(min, lambda x: 0)
+        queue.extend('abc')
+        self.assertEqual([queue.pop() for _ in range(3)], ['a', 'b', 'c'])
+        queue = PriorityQueue(min, lambda x: 0, tie=lambda x: -ord(x))
+        queue.extend('abc')
+        self.assertEqual([queue.pop() for _ in range(3)], ['c', 'b', 'a'])
+
+
+class TestQueues(unittest.TestCase):
+    def test_stack(self):
+        stack = Stack()
+        stack.extend([1, 2, 2, 3])
+        self.assertEqual(len(stack), 4)
+        self.assertEqual([stack.pop(), stack.pop()], [3, 2])
+        self.assertIn(2, stack)
+        self.assertNotIn(3, stack)
+        self.assertEqual([stack.pop(), stack.pop()], [2, 1])
+        self.assertFalse(stack)
+        self.assertNotIn(2, stack)
+
+    def test_fifo_duplicates(self):
+        queue = FIFOQueue()
+        queue.extend([1, 2, 1])
+        self.assertEqual(queue.pop(), 1)
+        self.assertIn(1, queue)
+        self.assertEqual([queue.pop(), queue.pop()], [2, 1])
+        self.assertNotIn(1, queue)
+
+
+class TestUninformedSearch(unittest.TestCase):
+    def test_depth_first(self):
+        problem = air_cargo_p2()
+        node = depth_first_graph_search(problem)
+        self.assertTrue(problem.goal_test(node.state))
+        self.assertEqual(len(set(n.state for n in node.path())), len(node.path()))
+
+    def test_breadth_first_tree(self):
+        problem = have_cake()
+        self.assertEqual(len(breadth_first_tree_search(problem).solution()), 2)
+
+
+class TestBestFirstSearch(unittest.TestCase):
+    def test_optimal(self):
+        optimal = len(breadth_first_search(air_cargo_p2()).solution())
+        self.assertEqual(len(uniform_cost_search(air_cargo_p2()).solution()), optimal)
+        problem = air_cargo_p2()
+        self.assertEqual(len(astar_search(problem, problem.h_unmet_goals).solution()), optimal)
+
+
+if __name__ == '__main__':
+    unittest.main()